@@ -0,0 +1,22 @@
+"""Shared fixtures of the benchmarks.
+
+Usage:
+    make bench                # Save the results in .benchmarks/
+    make bench-compare        # Compare with the last saved results
+    pytest benchmarks --benchmark-json=results.json
+"""
+
+import pytest
+
+from htmldoom.cache import cache_manager
+
+
+@pytest.fixture
+def cold():
+    """Clear the caches, and the tags' memos, before every round (cold paths)."""
+    return cache_manager.clear
+
+
+@pytest.fixture
+def jinja2():
+    return pytest.importorskip("jinja2")
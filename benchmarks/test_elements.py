@@ -0,0 +1,128 @@
+"""The element factories, per shape of the elements, and the attributes."""
+
+import tracemalloc
+from html import escape
+
+import pytest
+
+from htmldoom import elements as e
+from htmldoom.attrs import escape_attr, escape_attrs, fmt_props
+from htmldoom.base import Element, composite_tag, leaf_tag
+from htmldoom.fragment import Fragment, chunk
+from htmldoom.url import url
+from htmldoom.util import fmt_prop
+
+CHILD = b"<i>x</i>"
+
+SHAPES = {
+    "div()()": lambda: e.div()(),
+    "div()(bytes)": lambda: e.div()(CHILD),
+    "div()(str)": lambda: e.div()("text"),
+    "div()(x, x, x)": lambda: e.div()(CHILD, CHILD, CHILD),
+    "div(class_)(bytes)": lambda: e.div(class_="row")(CHILD),
+    "div(attrs)(bytes)": lambda: e.div("hidden", class_="row", id="a")(CHILD),
+    "br()": lambda: e.br(),
+    "img(class_)": lambda: e.img(class_="pic"),
+    "img(attrs)": lambda: e.img(src="/a.png", alt="a"),
+}
+
+VALUES = {
+    "clean": "btn btn-primary col-md-6",
+    "dirty": '/search?q="htmldoom"&page=2',
+    "long clean": "x" * 1000,
+    "long dirty": 'x & "y" ' * 100,
+}
+
+COLUMNS = {
+    "clean": [f"row-{i}" for i in range(1000)],
+    "dirty": [f'row "{i}" & more' for i in range(1000)],
+}
+
+
+@pytest.mark.parametrize("shape", list(SHAPES))
+def test_shape(benchmark, shape):
+    benchmark(SHAPES[shape])
+
+
+def test_composite_tag_cold(benchmark, cold):
+    tag = composite_tag("section")
+    benchmark.pedantic(
+        lambda: tag("hidden", id="x", data_y="z")(CHILD), setup=cold, rounds=1000
+    )
+
+
+def test_leaf_tag_cold(benchmark, cold):
+    tag = leaf_tag("embed")
+    benchmark.pedantic(lambda: tag("hidden", src="/x"), setup=cold, rounds=1000)
+
+
+def _closure(opening, closing):
+    """The closures the composite tags used to return instead of the elements."""
+    empty = Fragment((opening, closing))
+
+    def set_children(*children):
+        if len(children) == 1:
+            child = children[0]
+            if type(child) is bytes or type(child) is Fragment:
+                return Fragment((opening, child, closing))
+            return Fragment((opening, chunk(child), closing))
+        if not children:
+            return empty
+        return Fragment((opening, *map(chunk, children), closing))
+
+    return set_children
+
+
+def _traced(factory, openings):
+    """The bytes allocated to create an element per opening tag."""
+    tracemalloc.start()
+    try:
+        elements = [factory(o, b"</div>") for o in openings]
+        return tracemalloc.get_traced_memory()[0], elements
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize("factory", [_closure, Element], ids=["closure", "element"])
+def test_distinct_elements_memory(benchmark, factory):
+    """100k distinct elements, e.g. with per row ids. See the `bytes` extra info."""
+    openings = [f'<div id="row-{i}">'.encode() for i in range(100000)]
+    nbytes, _ = _traced(factory, openings)
+    benchmark.extra_info["bytes"] = nbytes
+    benchmark.extra_info["bytes_per_element"] = nbytes / len(openings)
+    benchmark.pedantic(lambda: [factory(o, b"</div>") for o in openings], rounds=5)
+
+
+@pytest.mark.parametrize("value", list(VALUES))
+def test_escape_attr(benchmark, value):
+    benchmark(escape_attr, VALUES[value])
+
+
+@pytest.mark.parametrize("value", list(VALUES))
+def test_escape_attr_baseline(benchmark, value):
+    """`html.escape(quote=True)`, to compare `escape_attr` with."""
+    benchmark(escape, VALUES[value], quote=True)
+
+
+@pytest.mark.parametrize("column", list(COLUMNS))
+def test_escape_attrs(benchmark, column):
+    benchmark(escape_attrs, COLUMNS[column])
+
+
+@pytest.mark.parametrize("column", list(COLUMNS))
+def test_escape_attrs_baseline(benchmark, column):
+    """`html.escape(quote=True)` per value, to compare `escape_attrs` with."""
+    values = COLUMNS[column]
+    benchmark(lambda: [escape(v, quote=True) for v in values])
+
+
+def test_fmt_prop(benchmark):
+    benchmark(fmt_prop, "data_id", 'a "quoted" value')
+
+
+def test_fmt_props(benchmark):
+    benchmark(fmt_props, ("hidden",), {"class_": "row", "data_id": "1", "id": "x"})
+
+
+def test_url(benchmark):
+    benchmark(url, "https", "foo.com", "bar", "baz", page=1, sortby=["id", "date"])
@@ -0,0 +1,57 @@
+"""The YAML and values loaders, with cold and warm caches."""
+
+import pytest
+
+from htmldoom.value_loader import loadvalues
+from htmldoom.yaml_loader import loadyaml
+
+NDIRECTIVES = 200
+
+
+@pytest.fixture
+def components(tmp_path):
+    path = tmp_path / "components.yml"
+    path.write_text(
+        "".join(
+            f"c{i}:\n  div:\n  - {{class: row-{i}}}\n  - - p: [[ 'component {i}' ]]\n"
+            for i in range(NDIRECTIVES)
+        )
+    )
+    return str(path)
+
+
+@pytest.fixture
+def values(tmp_path):
+    for i in range(20):
+        directory = tmp_path / "values" / f"d{i}"
+        directory.mkdir(parents=True)
+        for j in range(10):
+            (directory / f"v{j}.txt").write_text(f"value {i} {j} <&>")
+    return str(tmp_path / "values")
+
+
+def test_loadyaml_cold(benchmark, components):
+    def load_all():
+        loadyaml.cache_clear()
+        for i in range(NDIRECTIVES):
+            loadyaml(components, f"c{i}")
+
+    benchmark(load_all)
+
+
+def test_loadyaml_warm(benchmark, components):
+    benchmark(loadyaml, components, "c0")
+
+
+def test_loadvalues_cold(benchmark, values):
+    def load_all():
+        loadvalues.cache_clear()
+        return [v for d in loadvalues(values) for v in d]
+
+    benchmark(load_all)
+
+
+def test_loadvalues_warm(benchmark, values):
+    load = lambda: [v for d in loadvalues(values) for v in d]
+    load()
+    benchmark(load)
@@ -0,0 +1,149 @@
+"""Realistic page shapes, compared with Jinja2 and plain string concatenation."""
+
+from html import escape
+
+import pytest
+
+from htmldoom import elements as e
+from htmldoom import functions as fn
+from htmldoom import render, renders
+from htmldoom.compress import gzip_bytes
+
+NROWS = 1000
+ROWS = [
+    {"id": i, "name": f"user <{i}>", "email": f"user{i}@x.com"} for i in range(NROWS)
+]
+COLUMNS = {k: [r[k] for r in ROWS] for k in ROWS[0]}
+FIELDS = [f"field_{i}" for i in range(30)]
+
+
+def nested(depth):
+    el = e.p()("x" * 100)
+    for i in range(depth):
+        el = e.div(class_=f"level-{i % 5}")(el, e.span()("sibling"))
+    return el
+
+
+def table(rows):
+    return e.table(class_="table")(
+        *fn.foreach(rows)(
+            lambda r: e.tr()(
+                e.td()(str(r["id"])), e.td()(r["name"]), e.td()(r["email"])
+            )
+        )
+    )
+
+
+def form(fields):
+    return e.form(action="/submit", method="post", class_="form")(
+        *(
+            e.div(class_="form-group")(
+                e.label(for_=name, class_="control-label")(name),
+                e.input_(
+                    "required",
+                    type="text",
+                    id=name,
+                    name=name,
+                    class_="form-control",
+                    placeholder=f"Enter {name}",
+                    data_field=name,
+                ),
+            )
+            for name in fields
+        )
+    )
+
+
+@renders(e.tr()(e.td()("{id}"), e.td()("{name}"), e.td()("{email}")))
+def row(data):
+    return data
+
+
+@pytest.mark.parametrize("depth", [10, 100, 1000])
+def test_deep_nesting(benchmark, depth):
+    benchmark(lambda: render(nested(depth)))
+
+
+def test_wide_table_elements(benchmark):
+    benchmark(lambda: render(table(ROWS)))
+
+
+def test_wide_table_renders(benchmark):
+    benchmark(lambda: b"".join(map(row, ROWS)))
+
+
+def test_wide_table_rows(benchmark):
+    benchmark(lambda: row.rows(COLUMNS))
+
+
+def test_wide_table_string_concat(benchmark):
+    def concat():
+        return (
+            '<table class="table">'
+            + "".join(
+                f"<tr><td>{r['id']}</td><td>{escape(r['name'])}</td>"
+                f"<td>{escape(r['email'])}</td></tr>"
+                for r in ROWS
+            )
+            + "</table>"
+        )
+
+    assert concat() == render(table(ROWS))
+    benchmark(concat)
+
+
+def test_wide_table_jinja2(benchmark, jinja2):
+    template = jinja2.Template(
+        '<table class="table">{% for r in rows %}<tr><td>{{ r.id }}</td>'
+        "<td>{{ r.name }}</td><td>{{ r.email }}</td></tr>{% endfor %}</table>",
+        autoescape=True,
+    )
+    assert template.render(rows=ROWS) == render(table(ROWS))
+    benchmark(lambda: template.render(rows=ROWS))
+
+
+def test_form_warm(benchmark):
+    benchmark(lambda: render(form(FIELDS)))
+
+
+def test_form_cold(benchmark, cold):
+    benchmark.pedantic(lambda: render(form(FIELDS)), setup=cold, rounds=200)
+
+
+def test_form_jinja2(benchmark, jinja2):
+    template = jinja2.Template(
+        '<form action="/submit" method="post" class="form">{% for name in fields %}'
+        '<div class="form-group"><label for="{{ name }}" class="control-label">'
+        "{{ name }}</label><input required "
+        'type="text" id="{{ name }}" name="{{ name }}" class="form-control" '
+        'placeholder="Enter {{ name }}" data-field="{{ name }}" /></div>'
+        "{% endfor %}</form>",
+        autoescape=True,
+    )
+    assert template.render(fields=FIELDS) == render(form(FIELDS))
+    benchmark(lambda: template.render(fields=FIELDS))
+
+
+def test_renders_warm(benchmark):
+    benchmark(row, ROWS[0])
+
+
+@renders(
+    e.html()(
+        e.head()(e.title()("{title}")),
+        e.body()(
+            e.div(class_="content")(*(e.p()("Some static text.") for _ in range(200))),
+            "{user}",
+        ),
+    )
+)
+def article(data):
+    return data
+
+
+def test_gzip_whole_page(benchmark):
+    benchmark(lambda: gzip_bytes(article({"title": "Hello", "user": "<foo>"})))
+
+
+def test_gzip_precompressed(benchmark):
+    benchmark(article.gzip, {"title": "Hello", "user": "<foo>"})
@@ -1,11 +1,11 @@
 import os
+from functools import partial
 from types import MappingProxyType
 
-import markdown2
-
 import htmldoom
 from components import document
 from htmldoom import loadtxt, render
+from htmldoom.parallel import render_many
 from htmldoom.value_loader import EXTENSION_RENDERERS, loadvalues
 
 SRC_DIR = "docs/src"
@@ -13,6 +13,8 @@ DIST_DIR = "docs/static"
 
 
 def md_to_html(path):
+    import markdown2
+
     with open(path) as f:
         html = markdown2.markdown(f.read())
     return html
@@ -21,14 +23,20 @@ def md_to_html(path):
 EXTENSION_RENDERERS = dict(md=md_to_html, **EXTENSION_RENDERERS)
 
 
-def render_page(page):
-    """Render a page."""
+def page_document(page):
+    """The document of a page."""
 
     common_values = loadvalues(f"{SRC_DIR}/values")
     page_values = loadvalues(
         f"{SRC_DIR}/pages/{page}", extension_renderers=EXTENSION_RENDERERS
     )
-    return render(document(p=page_values, c=common_values))
+    return document(p=page_values, c=common_values)
+
+
+def render_page(page):
+    """Render a page."""
+
+    return render(page_document(page))
 
 
 def main():
@@ -37,8 +45,12 @@ def main():
     if not os.path.exists(DIST_DIR):
         os.mkdir(DIST_DIR)
 
-    for page in os.listdir(f"{SRC_DIR}/pages"):
-        doc = render_page(page)
+    pages = os.listdir(f"{SRC_DIR}/pages")
+    docs = render_many(
+        (partial(page_document, page) for page in pages),
+        warmup=partial(loadvalues, f"{SRC_DIR}/values"),
+    )
+    for page, doc in zip(pages, docs):
         with open(f"{DIST_DIR}/{page}.html", "w") as f:
             f.write(doc)
 
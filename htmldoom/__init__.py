@@ -14,15 +14,25 @@ __all__ = [
     "__license__",
     "doctype",
     "render",
+    "render_iter",
     "renders",
     "raw",
     "txt",
     "comment",
     "CacheConfig",
+    "Fragment",
     "loadraw",
     "loadtxt",
 ]
 
 from htmldoom.base import comment, doctype, raw, txt
 from htmldoom.conf import CacheConfig
-from htmldoom.util import loadraw, loadtxt, render, renders
+from htmldoom.fragment import Fragment
+from htmldoom.util import loadraw, loadtxt, render, render_iter, renders
+
+import os as _os
+
+if _os.environ.get("HTMLDOOM_PROFILE"):
+    from htmldoom.profile import _profile_process
+
+    _profile_process(_os.environ["HTMLDOOM_PROFILE"])
@@ -0,0 +1,270 @@
+"""Render the elements asynchronously using asyncio.
+
+Besides the usual elements, the children of the tags and the values returned to
+`@async_renders` can be awaitables (e.g. coroutines) or async iterators (e.g. async
+generators). All of them get scheduled concurrently as soon as they are found, while
+the rendered chunks are streamed in order, as soon as the leading ones are ready.
+The sync iterators (e.g. generators) are consumed lazily, as they're streamed, hence
+the async elements in them are found only when they're reached.
+
+The escaping rules are the same: the `str` results are escaped, `bytes` are not.
+
+Example:
+    >>> from htmldoom import elements as e
+    >>> from htmldoom.aio import async_render
+    >>>
+    >>> async def username(uid):
+    ...     user = await db.get_user(uid)
+    ...     return user.name
+    >>>
+    >>> await async_render(e.ul()(e.li()(username(1)), e.li()(username(2))))
+    '<ul><li>foo</li><li>bar</li></ul>'
+"""
+
+import asyncio
+from collections import Counter
+from functools import wraps
+from inspect import isawaitable
+
+try:
+    from collections.abc import AsyncIterable, Iterator
+except ImportError:  # pragma: no cover
+    from collections import AsyncIterable, Iterator
+
+from htmldoom.conf import RenderConfig
+from htmldoom.fragment import Fragment, _chunks, chunk, fragment
+from htmldoom.template import Template, _parse
+from htmldoom.util import render
+
+__all__ = ["async_render", "async_render_iter", "async_renders"]
+
+_END = object()
+
+
+class _Prefetch:
+    """Consumes an async iterable in the background."""
+
+    def __init__(self, aiterable):
+        self.queue = asyncio.Queue()
+        self.task = asyncio.ensure_future(self._fill(aiterable))
+
+    async def _fill(self, aiterable):
+        try:
+            async for el in aiterable:
+                await self.queue.put((el, None))
+        except Exception as err:
+            await self.queue.put((_END, err))
+        else:
+            await self.queue.put((_END, None))
+
+    def ready(self):
+        return not self.queue.empty()
+
+    async def next(self):
+        el, err = await self.queue.get()
+        if err is not None:
+            raise err
+        return el if el is _END else chunk(el)
+
+
+class _Resolved:
+    """The result of a single awaitable, once it's ready."""
+
+    def __init__(self, awaitable):
+        self.task = asyncio.ensure_future(awaitable)
+
+    def ready(self):
+        return self.task is None or self.task.done()
+
+    async def next(self):
+        if self.task is None:
+            return _END
+        result, self.task = await self.task, None
+        return chunk(result)
+
+
+def _schedule(frag, tasks):
+    """Start resolving the awaitables and async iterables in the fragment.
+
+    The sync iterators are left lazy, not to consume them before streaming.
+    """
+    stack = [frag]
+    while stack:
+        frag = stack.pop()
+        chunks = frag.chunks
+        if type(chunks) is tuple:
+            stack.extend(c for c in chunks if isinstance(c, Fragment))
+        elif isawaitable(chunks):
+            frag.chunks = _Resolved(chunks)
+            tasks.append(frag.chunks.task)
+        elif isinstance(chunks, AsyncIterable):
+            frag.chunks = _Prefetch(chunks)
+            tasks.append(frag.chunks.task)
+
+
+async def _walk(frag):
+    """Walk the fragment like `Fragment.stream()`, resolving the async elements.
+
+    It yields `None` before it's going to wait for an async element.
+    """
+    tasks = []
+    _schedule(frag, tasks)
+    try:
+        stack = [iter(frag.chunks)]
+        while stack:
+            source = stack[-1]
+            if isinstance(source, (_Resolved, _Prefetch)):
+                if not source.ready():
+                    yield None
+                c = await source.next()
+            else:
+                c = next(source, _END)
+
+            if c is _END:
+                stack.pop()
+            elif isinstance(c, Fragment):
+                _schedule(c, tasks)
+                chunks = c.chunks
+                stack.append(
+                    chunks
+                    if isinstance(chunks, (_Resolved, _Prefetch))
+                    else iter(_chunks(c, memoize=False))
+                )
+            else:
+                yield c
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def async_render_iter(*elements, chunk_size=None):
+    """Asynchronously render DOM elements chunk by chunk.
+
+    Works like `htmldoom.render_iter()`, but the pending chunks are also yielded as
+    soon as the rendering has to wait for some async element.
+
+    Example (ASGI):
+        >>> async def app(scope, receive, send):
+        ...     await send({"type": "http.response.start", "status": 200})
+        ...     async for chunk in async_render_iter(page(scope)):
+        ...         await send(
+        ...             {"type": "http.response.body", "body": chunk, "more_body": True}
+        ...         )
+        ...     await send({"type": "http.response.body", "body": b""})
+    """
+    if chunk_size is None:
+        chunk_size = RenderConfig.CHUNK_SIZE
+
+    buffer, size = [], 0
+    async for c in _walk(fragment(*elements)):
+        if c is not None:
+            buffer.append(c)
+            size += len(c)
+        if buffer and (c is None or size >= chunk_size):
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+async def async_render(*elements):
+    """Asynchronously render DOM elements.
+
+    Example:
+        >>> async def greet():
+        ...     return "hello"
+        >>>
+        >>> await async_render(e.p()(greet()))
+        '<p>hello</p>'
+    """
+    chunks = [c async for c in _walk(fragment(*elements)) if c is not None]
+    return b"".join(chunks).decode()
+
+
+def _eager(source):
+    """The fields of a template that `Template.fragment()` renders eagerly.
+
+    I.e. the fields used more than once or formatted further, e.g. `{x.title}`.
+    """
+    counts = Counter()
+    for _, field in _parse(source):
+        if field is not None:
+            name, rest, spec, conversion = field
+            counts[name] += 2 if rest or spec or conversion else 1
+    return tuple(name for name, count in counts.items() if count > 1)
+
+
+async def _resolve(value):
+    """Await an async value, rendering it if it's still not a plain value."""
+    if isawaitable(value):
+        value = await value
+    if isinstance(value, (Fragment, Iterator, AsyncIterable)) or isawaitable(value):
+        chunks = [c async for c in _walk(fragment(value)) if c is not None]
+        return b"".join(chunks)
+    return value
+
+
+async def _resolve_eager(fields, data):
+    """Resolve the values of the eagerly rendered fields once, concurrently."""
+    names = [
+        name
+        for name in fields
+        if name in data
+        and (
+            isawaitable(data[name])
+            or isinstance(data[name], (Fragment, Iterator, AsyncIterable))
+        )
+    ]
+    if not names:
+        return data
+    values = await asyncio.gather(*(_resolve(data[name]) for name in names))
+    data = dict(data)
+    data.update(zip(names, values))
+    return data
+
+
+def async_renders(*elements):
+    """Like `htmldoom.renders()` decorator, but renders asynchronously.
+
+    The decorated function can be a coroutine function and the returned values can
+    be awaitables or async iterables. The values used more than once in the template
+    are resolved in advance, only once.
+
+    Example:
+        >>> @async_renders(e.p()("{name}"), e.ul()("{items}"))
+        ... async def profile(uid):
+        ...     return {"name": get_name(uid), "items": get_items(uid)}
+        >>>
+        >>> await profile(1)
+        b'<p>foo</p><ul><li>bar</li></ul>'
+        >>>
+        >>> async for chunk in profile.iter(1):
+        ...     await send(chunk)
+    """
+    template = Template(render(*elements))
+    eager = _eager(template.source)
+
+    def wrapped(func):
+        async def get_fragment(*args, **kwargs):
+            data = func(*args, **kwargs)
+            if isawaitable(data):
+                data = await data
+            if eager:
+                data = await _resolve_eager(eager, data)
+            return template.fragment(data)
+
+        @wraps(func)
+        async def renderer(*args, **kwargs):
+            frag = await get_fragment(*args, **kwargs)
+            return b"".join([c async for c in _walk(frag) if c is not None])
+
+        async def iter_(*args, **kwargs):
+            async for c in async_render_iter(await get_fragment(*args, **kwargs)):
+                yield c
+
+        renderer.template = template
+        renderer.fragment = get_fragment
+        renderer.iter = iter_
+        return renderer
+
+    return wrapped
@@ -0,0 +1,173 @@
+"""Serialize the attributes of HTML tags.
+
+The attributes are passed as Python friendly keys, e.g. `class_` or `data_id`,
+which get normalized into the attribute names i.e. `class` or `data-id`. The
+normalized names are memoized since they come from a small set of keys, unlike
+the values, which are formatted afresh every time without relying on any cache.
+
+Example:
+    >>> from htmldoom.attrs import fmt_props
+    >>>
+    >>> fmt_props(("hidden",), {"class_": "row", "data_id": "1"})
+    'hidden class="row" data-id="1"'
+"""
+
+import re
+
+__all__ = [
+    "attr_name",
+    "escape_attr",
+    "escape_attrs",
+    "quote",
+    "fmt_props",
+    "normalize_props",
+    "fmt_normalized",
+]
+
+# Limits the memoized names, in case the keys are generated dynamically.
+_MAX_NAMES = 4096
+
+_names = {}
+_bool_attrs = {}
+_plain = re.compile("[a-zA-Z_]*").fullmatch
+
+
+def attr_name(key):
+    """Normalize the given key into an attribute name.
+
+    Example:
+        >>> attr_name("class_")
+        'class'
+        >>> attr_name("data_id")
+        'data-id'
+    """
+    try:
+        return _names[key]
+    except KeyError:
+        pass
+    name = key.rstrip("_").replace("_", "-")
+    if len(_names) < _MAX_NAMES:
+        _names[key] = name
+    return name
+
+
+def escape_attr(value):
+    """Escape `&`, `"`, `<` and `>` in an attribute value.
+
+    When there's nothing to escape, the same object is returned as it is.
+
+    Example:
+        >>> escape_attr('a "b" & c')
+        'a &quot;b&quot; &amp; c'
+    """
+    if not ("&" in value or '"' in value or "<" in value or ">" in value):
+        return value
+    return (
+        value.replace("&", "&amp;")
+        .replace('"', "&quot;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+    )
+
+
+def escape_attrs(values):
+    """Escape many attribute values at once, e.g. a column of a table.
+
+    Example:
+        >>> escape_attrs(["a", "b&c", '"d"'])
+        ['a', 'b&amp;c', '&quot;d&quot;']
+    """
+    values = list(values)
+    joined = "\0".join(values)
+    escaped = escape_attr(joined)
+    if escaped is joined:
+        return values
+    escaped = escaped.split("\0")
+    if len(escaped) != len(values):
+        # Some of the values contain the separator.
+        return [escape_attr(v) for v in values]
+    return escaped
+
+
+def quote(value):
+    """Double quote strings safely for attributes.
+
+    Example:
+        >>> quote('abc"xyz')
+        '"abc&quot;xyz"'
+    """
+    return f'"{escape_attr(value)}"'
+
+
+def _bool_attr(key):
+    try:
+        return _bool_attrs[key]
+    except KeyError:
+        pass
+    name = attr_name(key)
+    attr = name if _plain(name) else quote(name)
+    if len(_bool_attrs) < _MAX_NAMES:
+        _bool_attrs[key] = attr
+    return attr
+
+
+def fmt_props(bool_props=(), kv_props=None):
+    """Format all the attributes of an HTML tag in one pass.
+
+    Arguments:
+        bool_props: Keys of the boolean attributes, e.g. `("hidden",)`.
+        kv_props: A map of keys and values, e.g. `{"class_": "row"}`.
+
+    Example:
+        >>> fmt_props(("hidden",), {"class_": "row"})
+        'hidden class="row"'
+    """
+    attrs = [_bool_attr(x) for x in bool_props]
+    if kv_props:
+        names = _names
+        for k, v in kv_props.items():
+            attrs.append(f"{names.get(k) or attr_name(k)}={quote(v)}")
+    return " ".join(attrs)
+
+
+def normalize_props(bool_props=(), kv_props=None, sort=False):
+    """Normalize the attributes of a tag into a hashable key.
+
+    The keys are normalized into the attribute names, and the duplicated attributes
+    are dropped, the last value winning over the earlier ones and over the boolean
+    form. The attributes keep their order unless `sort` is set, in which case the
+    equivalent attributes get the same key no matter how they were passed.
+
+    Example:
+        >>> normalize_props(("hidden",), {"id_": "a", "class_": "b", "id": "c"})
+        (('hidden', None), ('id', 'c'), ('class', 'b'))
+        >>> normalize_props(("hidden",), {"class_": "b", "id": "c"}, sort=True)
+        (('class', 'b'), ('hidden', None), ('id', 'c'))
+    """
+    names = _names
+    props = {}
+    for key in bool_props:
+        props.setdefault(names.get(key) or attr_name(key), None)
+    if kv_props:
+        for key, value in kv_props.items():
+            props[names.get(key) or attr_name(key)] = value
+    if sort:
+        return tuple(sorted(props.items()))
+    return tuple(props.items())
+
+
+def fmt_normalized(props):
+    """Format the attributes normalized by `normalize_props()`.
+
+    Example:
+        >>> fmt_normalized((("class", "b"), ("hidden", None)))
+        'class="b" hidden'
+    """
+    return " ".join(
+        [
+            (name if _plain(name) else quote(name))
+            if value is None
+            else f"{name}={quote(value)}"
+            for name, value in props
+        ]
+    )
@@ -4,17 +4,25 @@ All the important objects here are also available in __init__.py so that
 you can just do `from htmldoom import composite_tag`.
 """
 
-from functools import lru_cache
 from html import escape
 
-from htmldoom.conf import CacheConfig
-from htmldoom.util import fmt_prop
-from htmldoom.util import render as _render
+from htmldoom.attrs import escape_attr, fmt_normalized, fmt_props, normalize_props
+from htmldoom.cache import cache_manager, cached
+from htmldoom.conf import RenderConfig
+from htmldoom.fragment import Fragment, chunk
 
-__all__ = ["doctype", "composite_tag", "leaf_tag", "txt", "raw", "comment"]
+__all__ = [
+    "doctype",
+    "composite_tag",
+    "leaf_tag",
+    "txt",
+    "raw",
+    "comment",
+    "Element",
+]
 
 
-@lru_cache(maxsize=CacheConfig.MAXSIZE)
+@cached("txt")
 def txt(text):
     """Convert to HTML escaped element.
 
@@ -25,7 +33,7 @@ def txt(text):
     return escape(text).encode()
 
 
-@lru_cache(maxsize=CacheConfig.MAXSIZE)
+@cached("raw")
 def raw(text):
     """Convert to HTML unescaped element (use with caution).
 
@@ -36,14 +44,19 @@ def raw(text):
     return text.encode()
 
 
-@lru_cache(maxsize=CacheConfig.MAXSIZE)
+@cached("comment")
 def comment(text):
     return (f"<!-- {escape(text)} -->").encode()
 
 
-@lru_cache(maxsize=CacheConfig.MAXSIZE)
+@cached("doctype")
 def doctype(*attrs):
-    return (f"<!DOCTYPE {' '.join(fmt_prop(x, None) for x in attrs)}>").encode()
+    return (f"<!DOCTYPE {fmt_props(attrs)}>").encode()
+
+
+# Limits the memoized `class_` only variants of each tag. They're kept outside of the
+# byte budget of the cache manager, in `cache_manager.memos`, and cleared with it.
+_MAX_CLASSES = 256
 
 
 def leaf_tag(tagname):
@@ -53,35 +66,93 @@ def leaf_tag(tagname):
         >>> mytag = leaf_tag("mytag")
         >>> mytag(foo="bar")
         b'<mytag foo="bar" />'
+
+    The tags without attributes or with only the `class_` attribute, being the most
+    common ones, skip the shared cache.
     """
 
-    @lru_cache(maxsize=CacheConfig.MAXSIZE)
-    def set_props(*bool_props, **kv_props):
+    bare = (f"<{tagname} />").encode()
+    classes = cache_manager.memos.setdefault(f"leaf_tag:{tagname}", {})
 
-        if bool_props and (callable(bool_props[0]) or isinstance(bool_props[0], bytes)):
+    @cached(f"leaf_tag:{tagname}")
+    def _set_props(props):
+        if not props:
+            return bare
+        return (f"<{tagname} {fmt_normalized(props)} />").encode()
+
+    def set_props(*bool_props, **kv_props):
+        if not bool_props:
+            if not kv_props:
+                return bare
+            if len(kv_props) == 1:
+                value = kv_props.get("class_")
+                if type(value) is str:
+                    try:
+                        return classes[value]
+                    except KeyError:
+                        pass
+                    tag = (f'<{tagname} class="{escape_attr(value)}" />').encode()
+                    if len(classes) < _MAX_CLASSES:
+                        classes[value] = tag
+                    return tag
+
+        if bool_props and (
+            callable(bool_props[0]) or isinstance(bool_props[0], (bytes, Fragment))
+        ):
             raise ValueError(
                 f"{tagname}(!WEIRD THINGS PASSED HERE!): here you pass tag attributes, not child elements."
                 " By the way, this is a leaf tag i.e. Doesn't support child elements."
             )
+        sort = RenderConfig.CANONICAL_ATTRS
+        return _set_props(normalize_props(bool_props, kv_props, sort))
 
-        if not bool_props and not kv_props:
-            return (f"<{tagname} />").encode()
+    set_props.cache_clear = lambda: (classes.clear(), _set_props.cache_clear())
+    return set_props
 
-        if not kv_props:
-            return (
-                f"<{tagname} {' '.join(fmt_prop(x, None) for x in bool_props)} />"
-            ).encode()
-        if not bool_props:
-            return (
-                f"<{tagname} {' '.join(fmt_prop(k, v) for k, v in kv_props.items())} />"
-            ).encode()
 
-        return (
-            f"<{tagname} {' '.join(fmt_prop(x, None) for x in bool_props)}"
-            f" {' '.join(fmt_prop(k, v) for k, v in kv_props.items())} />"
-        ).encode()
+class Element:
+    """A composite tag with its attributes set, waiting for its children.
 
-    return set_props
+    Calling it with the children returns the `Fragment` of the element. Only the
+    pre-rendered opening and closing tags are kept, hence the elements are compact,
+    and the same closing tag is shared by all the elements of a tag.
+
+    Example:
+        >>> from htmldoom import elements as e
+        >>>
+        >>> e.div(class_="x")
+        Element(b'<div class="x">', b'</div>')
+        >>> e.div(class_="x")("y")
+        Fragment(b'<div class="x">y</div>')
+    """
+
+    __slots__ = ("opening", "closing", "_empty")
+
+    def __init__(self, opening, closing):
+        self.opening = opening
+        self.closing = closing
+
+    def __call__(self, *children):
+        if len(children) == 1:
+            child = children[0]
+            if type(child) is bytes or type(child) is Fragment:
+                return Fragment((self.opening, child, self.closing))
+            return Fragment((self.opening, chunk(child), self.closing))
+        if not children:
+            # The fragments are immutable, hence the empty ones can be shared.
+            try:
+                return self._empty
+            except AttributeError:
+                self._empty = Fragment((self.opening, self.closing))
+                return self._empty
+        return Fragment((self.opening, *map(chunk, children), self.closing))
+
+    def __sizeof__(self):
+        # The closing tag is shared, only the opening one counts.
+        return object.__sizeof__(self) + len(self.opening)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.opening!r}, {self.closing!r})"
 
 
 def composite_tag(tagname):
@@ -90,41 +161,49 @@ def composite_tag(tagname):
     Example:
         >>> clipboard_copy = composite_tag("clipboard-copy")
         >>> clipboard_copy(value="foo")("Copy Me")
-        b'<clipboard-copy value="foo">Copy Me</clipboard_copy>'
+        Fragment(b'<clipboard-copy value="foo">Copy Me</clipboard-copy>')
+
+    The children are not copied into the returned fragment, hence nesting the tags
+    deeper doesn't multiply the rendering cost. Like with the leaf tags, the tags
+    without attributes or with only the `class_` attribute skip the shared cache.
     """
 
-    @lru_cache(maxsize=CacheConfig.MAXSIZE)
-    def set_props(*bool_props, **kv_props):
+    closing = (f"</{tagname}>").encode()
+    bare = Element((f"<{tagname}>").encode(), closing)
+    classes = cache_manager.memos.setdefault(f"composite_tag:{tagname}", {})
+
+    @cached(f"composite_tag:{tagname}")
+    def _set_props(props):
+        if not props:
+            return bare
+        return Element((f"<{tagname} {fmt_normalized(props)}>").encode(), closing)
 
-        if bool_props and (callable(bool_props[0]) or isinstance(bool_props[0], bytes)):
+    def set_props(*bool_props, **kv_props):
+        if not bool_props:
+            if not kv_props:
+                return bare
+            if len(kv_props) == 1:
+                value = kv_props.get("class_")
+                if type(value) is str:
+                    try:
+                        return classes[value]
+                    except KeyError:
+                        pass
+                    opening = (f'<{tagname} class="{escape_attr(value)}">').encode()
+                    element = Element(opening, closing)
+                    if len(classes) < _MAX_CLASSES:
+                        classes[value] = element
+                    return element
+
+        if bool_props and (
+            callable(bool_props[0]) or isinstance(bool_props[0], (bytes, Fragment))
+        ):
             raise ValueError(
                 f"{tagname}(!WEIRD THINGS PASSED HERE!): here you pass tag attributes, not child elements."
                 f" Follow this syntax: {tagname}(*args, **kwargs)(element1, element2, ...)"
             )
+        sort = RenderConfig.CANONICAL_ATTRS
+        return _set_props(normalize_props(bool_props, kv_props, sort))
 
-        @lru_cache(maxsize=CacheConfig.MAXSIZE)
-        def set_children(*children):
-
-            if not bool_props and not kv_props:
-                return (f"<{tagname}>{_render(*children)}</{tagname}>").encode()
-
-            if not kv_props:
-                return (
-                    f"<{tagname} {' '.join(fmt_prop(x, None) for x in bool_props)}>"
-                    f"{_render(*children)}</{tagname}>"
-                ).encode()
-            if not bool_props:
-                return (
-                    f"<{tagname} {' '.join(fmt_prop(k, v) for k, v in kv_props.items())}>"
-                    f"{_render(*children)}</{tagname}>"
-                ).encode()
-
-            return (
-                f"<{tagname} {' '.join(fmt_prop(x, None) for x in bool_props)}"
-                f" {' '.join(fmt_prop(k, v) for k, v in kv_props.items())}>"
-                f"{_render(*children)}</{tagname}>"
-            ).encode()
-
-        return set_children
-
+    set_props.cache_clear = lambda: (classes.clear(), _set_props.cache_clear())
     return set_props
@@ -0,0 +1,322 @@
+"""Build static sites incrementally.
+
+Every page is rendered while recording the files it depends on (see
+`htmldoom.deps`), i.e. the YAML components, the values, the loaded text or raw
+files, and the Python sources of the page and the `@renders` components. A manifest
+keeps the content hashes of the dependencies and of the output of every page. On
+rebuild, only the pages having changed dependencies are rendered again, and only
+the changed outputs are written.
+
+The YAML files are tracked per directive: when a file is edited, the directives used
+by a page are rendered again and compared with their hashes in the manifest, so that
+the pages using only the other directives of the file are not rendered again.
+
+The dependencies loaded outside of the recordings, e.g. the templates loaded at
+import time, can't be reloaded by the running process, like the Python sources. The
+manifest keeps their state from when they were loaded, so that the next process
+renders the pages again, and `watch()` returns when they change.
+
+Example:
+    >>> from functools import partial
+    >>> from htmldoom.build import build, watch
+    >>>
+    >>> pages = {f"{name}.html": partial(page, name) for name in ("index", "about")}
+    >>> build(pages, "dist")
+    ['index.html', 'about.html']
+    >>> build(pages, "dist")  # Nothing changed
+    []
+    >>> watch(pages, "dist")  # Keep rebuilding until a Python source changes
+"""
+
+import json
+import os
+import time
+from functools import partial
+from hashlib import sha256
+from tempfile import mkstemp
+
+from htmldoom import deps
+from htmldoom.util import render
+from htmldoom.yaml_loader import _document
+
+__all__ = ["MANIFEST", "build", "watch"]
+
+# The default name of the manifest file in the output directory.
+MANIFEST = ".htmldoom-manifest.json"
+
+# Bump it when the format of the manifest changes.
+_VERSION = 2
+
+# The state of the dependencies loaded outside of the recordings (`deps.shared`),
+# when they were first seen by the process: {dep: [stamp, digest(, directive digest)]}
+_shared = {}
+
+
+def _stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _digest(path):
+    """Hash the content of a file, or the listing of a directory."""
+    try:
+        if os.path.isdir(path):
+            return sha256("\0".join(sorted(os.listdir(path))).encode()).hexdigest()
+        with open(path, "rb") as f:
+            return sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _changed(files):
+    """Check if some of the files changed, hashing only the touched ones.
+
+    The files map the paths to their `[stamp, digest]`. The stamps of the touched
+    but unchanged files get updated in place.
+    """
+    for path, (stamp, digest) in files.items():
+        current = _stamp(path)
+        if current == stamp:
+            continue
+        if _digest(path) != digest:
+            return True
+        files[path][0] = current
+    return False
+
+
+def _directive(directive, static):
+    """The key of a YAML directive in the manifest."""
+    return json.dumps([list(directive), static])
+
+
+def _render_directive(path, key):
+    directive, static = json.loads(key)
+    return _document(path).render(tuple(directive), static)
+
+
+def _changed_directives(directives):
+    """Like `_changed()`, but only the used directives of the YAML files count.
+
+    The directives map the paths to their `[stamp, digest, {directive: digest}]`.
+    """
+    for path, entry in directives.items():
+        stamp, digest, rendered = entry
+        current = _stamp(path)
+        if current == stamp:
+            continue
+        new = _digest(path)
+        if new != digest:
+            for key, value in rendered.items():
+                try:
+                    data = _render_directive(path, key)
+                except Exception:
+                    # Removed or broken, let rendering the page report it.
+                    return True
+                if sha256(data).hexdigest() != value:
+                    return True
+            entry[1] = new
+        entry[0] = current
+    return False
+
+
+def _state(dep):
+    """The state of a dependency, i.e. a path or a YAML directive."""
+    if isinstance(dep, str):
+        return [_stamp(dep), _digest(dep)]
+    path, directive, static = dep
+    try:
+        rendered = _render_directive(path, _directive(directive, static))
+    except Exception:
+        # Removed or broken, like `None` for the missing files.
+        return [_stamp(path), _digest(path), None]
+    return [_stamp(path), _digest(path), sha256(rendered).hexdigest()]
+
+
+def _snapshot(shared):
+    """Keep the state of the shared dependencies seen for the first time."""
+    for dep in shared:
+        if dep not in _shared:
+            _shared[dep] = _state(dep)
+
+
+def _changed_shared():
+    """Find the path of a shared dependency changed since it was loaded."""
+    for dep, state in _shared.items():
+        path = dep if isinstance(dep, str) else dep[0]
+        if _stamp(path) == state[0] or _digest(path) == state[1]:
+            continue
+        if isinstance(dep, str) or _state(dep)[2] != state[2]:
+            return path
+    return None
+
+
+def _directives_state(path, used):
+    """The state of the directives used from a YAML file, `{key: dep}`.
+
+    The shared ones are kept as they were loaded, for the next process to notice
+    that they changed.
+    """
+    stamp, digest, rendered = _stamp(path), _digest(path), {}
+    for key, dep in sorted(used.items()):
+        if dep in _shared:
+            stamp, digest, rendered[key] = _shared[dep]
+        else:
+            rendered[key] = sha256(_render_directive(path, key)).hexdigest()
+    return [stamp, digest, rendered]
+
+
+def _recorded(entry, dep):
+    """Check if a dependency, i.e. a path or a YAML directive, is in the entry."""
+    if isinstance(dep, str):
+        return dep in entry["deps"]
+    path, directive, static = dep
+    if path in entry["deps"]:
+        return True
+    return _directive(directive, static) in entry["directives"].get(path, ({},))[-1]
+
+
+def _source(job):
+    """Find the Python source file of a page."""
+    while isinstance(job, partial):
+        job = job.func
+    code = getattr(job, "__code__", None)
+    return code.co_filename if code is not None else None
+
+
+def _write(path, data):
+    """Atomically replace the content of a file."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = mkstemp(prefix=".htmldoom-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _read_manifest(path):
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != _VERSION:
+        return {}
+    return manifest["pages"]
+
+
+def build(pages, output_dir, manifest=None):
+    """Render the pages whose dependencies changed since the last build.
+
+    Arguments:
+        pages: A map of the output paths, relative to `output_dir`, and the
+            callables returning the elements of the pages.
+        output_dir (str): The directory to write the rendered pages in.
+        manifest (str): The path of the manifest file. Defaults to `MANIFEST` in
+            the output directory.
+
+    Returns the list of the rendered pages.
+    """
+    if manifest is None:
+        manifest = os.path.join(output_dir, MANIFEST)
+
+    entries = _read_manifest(manifest)
+    old = json.dumps(entries, sort_keys=True)
+    shared = set(deps.shared)
+    _snapshot(shared)
+    rendered = []
+
+    for name, job in pages.items():
+        target = os.path.join(output_dir, name)
+        entry = entries.get(name)
+        if (
+            entry is not None
+            and all(_recorded(entry, dep) for dep in shared)
+            and not _changed({target: entry["output"]})
+            and not _changed(entry["deps"])
+            and not _changed_directives(entry["directives"])
+        ):
+            continue
+
+        with deps.recording() as files:
+            data = render(job()).encode()
+        files.update(shared)
+        source = _source(job)
+        if source is not None:
+            files.add(source)
+
+        paths = {f for f in files if isinstance(f, str)}
+        directives = {}
+        for f in files:
+            if not isinstance(f, str) and f[0] not in paths:
+                directives.setdefault(f[0], {})[_directive(*f[1:])] = f
+
+        digest = sha256(data).hexdigest()
+        if _digest(target) != digest:
+            _write(target, data)
+        entries[name] = {
+            "output": [_stamp(target), digest],
+            "deps": {
+                f: list(_shared[f]) if f in _shared else [_stamp(f), _digest(f)]
+                for f in sorted(paths)
+            },
+            "directives": {
+                path: _directives_state(path, used)
+                for path, used in sorted(directives.items())
+            },
+        }
+        rendered.append(name)
+
+    for name in set(entries) - set(pages):
+        del entries[name]
+
+    if json.dumps(entries, sort_keys=True) != old:
+        data = json.dumps({"version": _VERSION, "pages": entries}, indent=2)
+        _write(manifest, data.encode())
+    return rendered
+
+
+def watch(pages, output_dir, manifest=None, interval=0.1, on_build=None):
+    """Build the pages, then keep rebuilding them whenever their dependencies change.
+
+    The changes in the Python sources, and in the other files loaded outside of the
+    recordings (e.g. the templates loaded at import time), can't be applied to the
+    running process. Hence, it returns the path of the first changed one, so that
+    the caller can restart the process.
+
+    Arguments:
+        pages, output_dir, manifest: Same as `build()`.
+        interval (float): Seconds to wait between the checks for changes.
+        on_build: Called with the list of the pages rendered by each rebuild.
+    """
+    if manifest is None:
+        manifest = os.path.join(output_dir, MANIFEST)
+
+    sources, first = {}, True
+    while True:
+        # Check before building, not to render the pages with the stale code.
+        for path, stamp in sources.items():
+            if _stamp(path) != stamp:
+                return path
+        changed = _changed_shared()
+        if changed is not None:
+            return changed
+
+        rendered = build(pages, output_dir, manifest)
+        if rendered or first:
+            sources = {
+                path: stamp
+                for entry in _read_manifest(manifest).values()
+                for path, (stamp, _) in entry["deps"].items()
+                if path.endswith(".py")
+            }
+            if on_build is not None:
+                on_build(rendered)
+            first = False
+        time.sleep(interval)
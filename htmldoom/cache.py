@@ -0,0 +1,370 @@
+"""A central, bounded cache for everything htmldoom memoizes.
+
+All the cached functions (`txt`, `raw`, `render`, `renders`, the tag closures,
+`loadyaml`, ...) register themselves with the same `CacheManager`. Hence, a single
+byte budget bounds the memory used by all of them together.
+
+Example:
+    >>> from htmldoom.cache import LFU, cache_manager
+    >>>
+    >>> cache_manager.resize(maxbytes=8 * 1024 * 1024)
+    >>> cache_manager.set_policy(LFU())
+    >>> cache_manager.clear()
+"""
+
+import sys
+from collections import Counter, OrderedDict, defaultdict
+from functools import wraps
+from threading import RLock
+from time import monotonic
+
+from htmldoom.conf import CacheConfig
+
+__all__ = ["LRU", "LFU", "TTL", "CacheManager", "cache_manager", "cached"]
+
+_MISSING = object()
+
+
+class LRU:
+    """Evicts the least recently used entry first."""
+
+    def __init__(self):
+        self.data = OrderedDict()
+
+    def get(self, key, default):
+        try:
+            value = self.data[key]
+        except KeyError:
+            return default
+        self.data.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.data[key] = value
+
+    def pop(self, key):
+        return self.data.pop(key)
+
+    def victim(self):
+        return next(iter(self.data))
+
+    def keys(self):
+        return list(self.data)
+
+    def clear(self):
+        self.data.clear()
+
+    def __len__(self):
+        return len(self.data)
+
+
+class LFU:
+    """Evicts the least frequently used entry first (the oldest one on a tie)."""
+
+    def __init__(self):
+        self.data = {}
+        self.freqs = {}
+        self.buckets = defaultdict(OrderedDict)
+        self.min_freq = 0
+
+    def _touch(self, key):
+        freq = self.freqs[key]
+        bucket = self.buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[freq]
+            if self.min_freq == freq:
+                self.min_freq = freq + 1
+        self.freqs[key] = freq + 1
+        self.buckets[freq + 1][key] = None
+
+    def get(self, key, default):
+        try:
+            value = self.data[key]
+        except KeyError:
+            return default
+        self._touch(key)
+        return value
+
+    def put(self, key, value):
+        if key in self.data:
+            self.data[key] = value
+            self._touch(key)
+            return
+        self.data[key] = value
+        self.freqs[key] = 1
+        self.buckets[1][key] = None
+        self.min_freq = 1
+
+    def pop(self, key):
+        freq = self.freqs.pop(key)
+        bucket = self.buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[freq]
+            if self.min_freq == freq and self.buckets:
+                self.min_freq = min(self.buckets)
+        return self.data.pop(key)
+
+    def victim(self):
+        return next(iter(self.buckets[self.min_freq]))
+
+    def keys(self):
+        return list(self.data)
+
+    def clear(self):
+        self.data.clear()
+        self.freqs.clear()
+        self.buckets.clear()
+        self.min_freq = 0
+
+    def __len__(self):
+        return len(self.data)
+
+
+class TTL:
+    """Expires the entries `ttl` seconds after they were cached.
+
+    When the cache is full, the oldest entry is evicted first.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.data = OrderedDict()
+
+    def get(self, key, default):
+        try:
+            expires, value = self.data[key]
+        except KeyError:
+            return default
+        if expires < monotonic():
+            del self.data[key]
+            return default
+        return value
+
+    def put(self, key, value):
+        self.data.pop(key, None)
+        self.data[key] = (monotonic() + self.ttl, value)
+
+    def pop(self, key):
+        return self.data.pop(key)[1]
+
+    def victim(self):
+        return next(iter(self.data))
+
+    def keys(self):
+        return list(self.data)
+
+    def clear(self):
+        self.data.clear()
+
+    def __len__(self):
+        return len(self.data)
+
+
+def _name(key):
+    """The name of the cache of a key i.e. its first item, see `cached()`."""
+    if type(key) is tuple and key:
+        return key[0]
+    return None
+
+
+def _sizeof(obj):
+    """Approximate the memory held by a cached key or value."""
+    if isinstance(obj, (bytes, str)):
+        return len(obj)
+    if isinstance(obj, tuple):
+        return sum(map(_sizeof, obj))
+    # The elements count their opening tags, see `Element.__sizeof__`.
+    return sys.getsizeof(obj)
+
+
+class CacheManager:
+    """A cache shared by all the registered functions under one memory budget.
+
+    Arguments:
+        maxbytes (int): Approximate size limit of all the cached keys and values.
+        maxsize (int): Limit of the number of cached entries.
+        policy: The eviction policy i.e. `LRU()`, `LFU()` or `TTL(seconds)`.
+        max_entry_bytes (int): Bigger entries are not cached at all.
+
+    The `memos` are the small dicts kept outside of the budget, e.g. the memoized
+    `class_` only variants of the tags, `{name: dict}`. Their owners bound them
+    separately, but they're cleared along with the caches of the same name.
+    """
+
+    def __init__(self, maxbytes, maxsize, policy, max_entry_bytes=None):
+        self.maxbytes = maxbytes
+        self.maxsize = maxsize
+        self.max_entry_bytes = maxbytes if max_entry_bytes is None else max_entry_bytes
+        self.policy = policy
+        self.names = set()
+        self.memos = {}
+        self.sizes = {}
+        self.nbytes = 0
+        self.hits = Counter()
+        self.misses = Counter()
+        self.evictions = Counter()
+        self._lock = RLock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self.policy.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses[_name(key)] += 1
+                if key in self.sizes:
+                    # Expired by the policy.
+                    self.nbytes -= self.sizes.pop(key)
+                    self.evictions[_name(key)] += 1
+                return default
+            self.hits[_name(key)] += 1
+            return value
+
+    def set(self, key, value):
+        size = _sizeof(key) + _sizeof(value)
+        if size > self.max_entry_bytes or size > self.maxbytes:
+            return
+        with self._lock:
+            if key in self.sizes:
+                self.policy.pop(key)
+                self.nbytes -= self.sizes.pop(key)
+            # Make room first, so that the new entry can't be its own victim.
+            self._shrink(size, 1)
+            self.policy.put(key, value)
+            self.sizes[key] = size
+            self.nbytes += size
+
+    def _shrink(self, nbytes=0, nentries=0):
+        while self.sizes and (
+            self.nbytes + nbytes > self.maxbytes
+            or len(self.sizes) + nentries > self.maxsize
+        ):
+            key = self.policy.victim()
+            self.policy.pop(key)
+            self.nbytes -= self.sizes.pop(key)
+            self.evictions[_name(key)] += 1
+
+    def delete(self, key):
+        """Remove an entry, if it's cached."""
+        with self._lock:
+            if key in self.sizes:
+                self.policy.pop(key)
+                self.nbytes -= self.sizes.pop(key)
+
+    def clear(self, name=None):
+        """Clear the entries of the given cache, or of all the caches."""
+        with self._lock:
+            if name is None:
+                for memo in self.memos.values():
+                    memo.clear()
+                self.policy.clear()
+                self.sizes.clear()
+                self.nbytes = 0
+                return
+            if name in self.memos:
+                self.memos[name].clear()
+            for key in self.policy.keys():
+                if isinstance(key, tuple) and key[0] == name:
+                    self.policy.pop(key)
+                    self.nbytes -= self.sizes.pop(key)
+
+    def resize(self, maxbytes=None, maxsize=None, max_entry_bytes=None):
+        """Change the limits at runtime, evicting entries if needed."""
+        with self._lock:
+            if maxbytes is not None:
+                self.maxbytes = maxbytes
+            if maxsize is not None:
+                self.maxsize = maxsize
+            if max_entry_bytes is not None:
+                self.max_entry_bytes = max_entry_bytes
+            self._shrink()
+
+    def set_policy(self, policy):
+        """Switch to a different eviction policy. It clears the cached entries."""
+        with self._lock:
+            self.policy = policy
+            self.sizes.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        """Count the hits, misses, evictions, entries and bytes of every cache."""
+        with self._lock:
+            names = self.names | set(self.hits) | set(self.misses) | set(self.evictions)
+            stats = {
+                name: dict(
+                    hits=self.hits[name],
+                    misses=self.misses[name],
+                    evictions=self.evictions[name],
+                    entries=0,
+                    bytes=0,
+                )
+                for name in names
+            }
+            for key, size in self.sizes.items():
+                name = _name(key)
+                if name not in stats:
+                    stats[name] = dict(
+                        hits=0, misses=0, evictions=0, entries=0, bytes=0
+                    )
+                stats[name]["entries"] += 1
+                stats[name]["bytes"] += size
+            return stats
+
+    def reset_stats(self):
+        """Reset the hits, misses and evictions counters."""
+        with self._lock:
+            self.hits.clear()
+            self.misses.clear()
+            self.evictions.clear()
+
+    def __len__(self):
+        return len(self.sizes)
+
+
+def _default_policy():
+    if CacheConfig.POLICY == "lfu":
+        return LFU()
+    if CacheConfig.POLICY == "ttl":
+        return TTL(CacheConfig.TTL)
+    return LRU()
+
+
+cache_manager = CacheManager(
+    maxbytes=CacheConfig.MAXBYTES,
+    maxsize=CacheConfig.MAXSIZE,
+    policy=_default_policy(),
+    max_entry_bytes=CacheConfig.MAX_ENTRY_BYTES,
+)
+
+
+def cached(name, manager=cache_manager):
+    """Memoize a function in the shared cache under the given name.
+
+    Like `functools.lru_cache`, the arguments must be hashable.
+
+    Example:
+        >>> @cached("double")
+        ... def double(x):
+        ...     return x * 2
+        >>>
+        >>> double(2)
+        4
+        >>> double.cache_clear()
+    """
+
+    def wrapped(func):
+        manager.names.add(name)
+
+        @wraps(func)
+        def cached_func(*args, **kwargs):
+            key = (name, args, tuple(kwargs.items())) if kwargs else (name, args)
+            value = manager.get(key, _MISSING)
+            if value is _MISSING:
+                value = func(*args, **kwargs)
+                manager.set(key, value)
+            return value
+
+        cached_func.cache_clear = lambda: manager.clear(name)
+        return cached_func
+
+    return wrapped
@@ -0,0 +1,158 @@
+"""Compile YAML components or value directories into Python modules ahead of time.
+
+The generated module has the rendered components as `bytes` constants and the
+templates compiled into functions. Hence, importing it is all it takes to load the
+components, without parsing or rendering anything at startup.
+
+Usage:
+    python -m htmldoom.compile path/to/components.yml -o components_compiled.py
+    python -m htmldoom.compile path/to/values -o values_compiled.py
+
+Example:
+    >>> import components_compiled as c
+    >>>
+    >>> c.load("paragraph.myfav")  # Same as loadyaml(path, "paragraph.myfav")
+    b'<p>{foo}</p>'
+    >>> c.RENDERERS["paragraph", "myfav"]({"foo": "bar"})
+    b'<p>bar</p>'
+"""
+
+import argparse
+import os
+import sys
+
+from htmldoom.template import Template, _compile
+from htmldoom.value_loader import loadvalues
+from htmldoom.yaml_loader import _document, loadyaml, parse
+
+__all__ = ["compile_yaml", "compile_values", "main"]
+
+_YAML_MODULE = '''\
+"""Generated by `python -m htmldoom.compile {source}`. Do not edit."""
+
+from htmldoom.fragment import Fragment as _Fragment
+from htmldoom.template import _chunk, _legacy, _missing, _slot, _text
+
+# The rendered components i.e. `loadyaml(path, directive)`
+COMPONENTS = {components}
+
+{functions}
+# The compiled templates of the components having fields
+RENDERERS = {renderers}
+
+# Same as the `fragment` of the templates
+FRAGMENTS = {fragments}
+
+
+def load(directive=None, static=False):
+    """Load a component like `loadyaml(path, directive, static)`."""
+    if isinstance(directive, str):
+        directive = directive.split(".")
+    data = COMPONENTS[tuple(directive) if directive else ()]
+    if static:
+        data = data.replace(b"{{", b"{{{{").replace(b"}}", b"}}}}")
+    return data
+'''
+
+_VALUES_MODULE = '''\
+"""Generated by `python -m htmldoom.compile {source}`. Do not edit."""
+
+from collections import namedtuple as _namedtuple
+
+# Same as `loadvalues(path)`
+VALUES = {values}
+'''
+
+
+def _directives(elements, directive=()):
+    """Find the directives of the components, skipping the namespaces."""
+    if elements is None:
+        return
+    try:
+        parse(elements)
+    except (ValueError, TypeError):
+        if not isinstance(elements, dict):
+            raise
+        for key, value in elements.items():
+            yield from _directives(value, (*directive, key))
+    else:
+        yield directive
+
+
+def _dict(items):
+    if not items:
+        return "{}"
+    lines = "".join(f"    {k}: {v},\n" for k, v in items)
+    return f"{{\n{lines}}}"
+
+
+def compile_yaml(path):
+    """Generate the code of a module with the compiled components of a YAML file."""
+    components, functions, renderers, fragments = [], [], [], []
+    for directive in _directives(_document(os.fspath(path)).elements):
+        data = loadyaml(path, directive)
+        components.append((repr(directive), repr(data)))
+        try:
+            template = Template(data.decode())
+        except ValueError:
+            # Not a valid template, e.g. it has `{}` or `{!}` in it.
+            continue
+        if not template.fields:
+            continue
+        i = len(renderers)
+        _, code, _ = _compile(template.source, (f"_render_{i}", f"_fragment_{i}"))
+        functions.append(f"# {'.'.join(map(str, directive))}\n{code}\n")
+        renderers.append((repr(directive), f"_render_{i}"))
+        fragments.append((repr(directive), f"_fragment_{i}"))
+
+    return _YAML_MODULE.format(
+        source=path,
+        components=_dict(components),
+        functions="".join(f"\n{f}" for f in functions),
+        renderers=_dict(renderers),
+        fragments=_dict(fragments),
+    )
+
+
+def _values(values, indent=""):
+    if not hasattr(values, "_fields"):
+        return repr(values)
+    fields = ", ".join(map(repr, values._fields))
+    items = "".join(
+        f"{indent}    {k}={_values(v, indent + '    ')},\n"
+        for k, v in zip(values._fields, values)
+    )
+    return f"_namedtuple({type(values).__name__!r}, [{fields}])(\n{items}{indent})"
+
+
+def compile_values(path, extension_renderers=None):
+    """Generate the code of a module with the values loaded from a directory."""
+    values = loadvalues(path, extension_renderers=extension_renderers)
+    return _VALUES_MODULE.format(source=path, values=_values(values))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m htmldoom.compile",
+        description="Compile YAML components or values into a Python module.",
+    )
+    parser.add_argument("source", help="A YAML file or a directory of values.")
+    parser.add_argument(
+        "-o", "--output", help="The module to generate. Defaults to stdout."
+    )
+    args = parser.parse_args(argv)
+
+    if os.path.isdir(args.source):
+        code = compile_values(args.source)
+    else:
+        code = compile_yaml(args.source)
+
+    if args.output is None:
+        sys.stdout.write(code)
+        return
+    with open(args.output, "w") as f:
+        f.write(code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Compress the rendered output, e.g. for the `Content-Encoding` of the responses.
+
+`render_compressed()` compresses the elements while streaming them, flushing the
+compressor after every chunk, so that the client can start parsing the page early.
+
+`render_gzip()` renders a template into a gzip stream, compressing only the slot
+values per render. The static segments of the template are compressed only once,
+each ending with a full flush. A full flush aligns the compressed data to a byte
+boundary and resets the history of the compressor, so the independently compressed
+segments and slot values can be joined into a single valid deflate stream. The
+`@renders` components use it with `component.gzip(...)`.
+
+Example:
+    >>> from htmldoom.compress import render_compressed
+    >>>
+    >>> def app(environ, start_response):
+    ...     start_response(
+    ...         "200 OK", [("Content-Type", "text/html"), ("Content-Encoding", "gzip")]
+    ...     )
+    ...     return render_compressed(page(), encoding="gzip")
+    >>>
+    >>> gzip.decompress(paras.gzip({"x": "foo"}))
+    b'<p>foo</p><p>another foo</p>'
+"""
+
+import struct
+import zlib
+from weakref import WeakKeyDictionary
+
+from htmldoom.template import _missing, _slot
+from htmldoom.util import render_iter
+
+__all__ = ["render_compressed", "render_gzip", "gzip_bytes"]
+
+# No file name, no modification time, unknown OS.
+_GZIP_HEADER = b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff"
+
+# The final (empty) block of a deflate stream.
+_END = zlib.compressobj(wbits=-zlib.MAX_WBITS).flush()
+
+# The default compression levels, Brotli's own default being too slow to stream.
+_LEVELS = {"gzip": 6, "br": 5}
+
+# The smaller slot values are stored uncompressed, not worth a compressor.
+_STORED_MAX = 128
+
+# The precompressed layouts of the templates: {template: layout}
+_layouts = WeakKeyDictionary()
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        raise ImportError(
+            "Brotli compression needs the brotli package: pip install brotli"
+        ) from None
+    return brotli
+
+
+def render_compressed(*elements, encoding="gzip", level=None, chunk_size=None):
+    """Render DOM elements chunk by chunk, compressed with gzip or Brotli.
+
+    Like `render_iter()`, the small chunks are merged up to the `chunk_size` before
+    being compressed and flushed. Brotli needs the `brotli` package.
+
+    Arguments:
+        encoding (str): "gzip" or "br".
+        level (int): The compression level (gzip) or quality (Brotli).
+    """
+    if encoding not in _LEVELS:
+        raise ValueError(f"{encoding}: unsupported encoding, expected gzip or br.")
+    if level is None:
+        level = _LEVELS[encoding]
+
+    chunks = render_iter(*elements, chunk_size=chunk_size)
+    if encoding == "gzip":
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for c in chunks:
+            yield compressor.compress(c) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+        return
+
+    compressor = _brotli().Compressor(quality=level)
+    for c in chunks:
+        yield compressor.process(c) + compressor.flush()
+    yield compressor.finish()
+
+
+def gzip_bytes(data, level=6):
+    """Compress rendered bytes into a gzip stream."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _deflate(data, level, compressor=None):
+    """Compress into a raw deflate segment that can be joined with others."""
+    if compressor is None:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush(zlib.Z_FULL_FLUSH)
+
+
+def _stored(data):
+    """A stored (uncompressed) deflate block, assuming a byte aligned stream."""
+    return struct.pack("<BHH", 0, len(data), len(data) ^ 0xFFFF) + data
+
+
+def _layout(template):
+    """Precompress the static segments of a template, only once."""
+    try:
+        return _layouts[template]
+    except KeyError:
+        pass
+    layout = template._layout
+    if layout is not None:
+        layout = tuple(
+            (
+                (part, _deflate(part, zlib.Z_BEST_COMPRESSION))
+                if isinstance(part, bytes)
+                else part
+            )
+            for part in layout
+        )
+    _layouts[template] = layout
+    return layout
+
+
+def render_gzip(template, data, level=6):
+    """Render a template into a gzip stream, compressing only the slot values.
+
+    The templates having fields that need further formatting (e.g. `{x.y}` or
+    `{x:>4}`) are rendered and compressed as a whole.
+
+    Example:
+        >>> gzip.decompress(render_gzip(Template("<p>{x}</p>"), {"x": "foo"}))
+        b'<p>foo</p>'
+    """
+    layout = _layout(template)
+    if layout is None:
+        return gzip_bytes(template.render(data), level)
+
+    compressor, crc, size, parts = None, 0, 0, [_GZIP_HEADER]
+    for part in layout:
+        if type(part) is tuple:
+            raw, deflated = part
+        else:
+            try:
+                raw = _slot(data[part])
+            except KeyError:
+                _missing(template.fields, data)
+                raise
+            if not raw:
+                continue
+            if len(raw) <= _STORED_MAX:
+                deflated = _stored(raw)
+            else:
+                if compressor is None:
+                    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+                deflated = _deflate(raw, level, compressor)
+        crc = zlib.crc32(raw, crc)
+        size += len(raw)
+        parts.append(deflated)
+    parts.append(_END)
+    parts.append(struct.pack("<II", crc & 0xFFFFFFFF, size & 0xFFFFFFFF))
+    return b"".join(parts)
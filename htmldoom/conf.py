@@ -1,2 +1,32 @@
 class CacheConfig:
+    # Initial limits of the shared cache. To change them at runtime,
+    # use `htmldoom.cache.cache_manager.resize()`.
     MAXSIZE = 17500
+    MAXBYTES = 64 * 1024 * 1024
+
+    # Bigger entries are one-offs most of the time, not worth caching.
+    MAX_ENTRY_BYTES = 16 * 1024
+
+    # One of "lru", "lfu" or "ttl".
+    POLICY = "lru"
+    TTL = 3600
+
+
+class RenderConfig:
+    # The approximate size of the chunks yielded while streaming.
+    CHUNK_SIZE = 16 * 1024
+
+    # Write the attributes of the tags sorted by name, instead of in the order they
+    # were passed. Hence, the equivalent tags share the cached entries, and the
+    # output is deterministic.
+    CANONICAL_ATTRS = False
+
+
+class YamlConfig:
+    # Check the YAML files for changes on every load, to reload the edited ones.
+    # Disable it in production to save the `stat()` calls.
+    HOT_RELOAD = True
+
+    # Store the rendered directives in a `.htmldoomc` file next to each YAML file,
+    # so that a fresh process can load them without parsing the YAML again.
+    DISK_CACHE = False
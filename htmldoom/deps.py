@@ -0,0 +1,57 @@
+"""Record the files that the rendered elements depend on, e.g. for `htmldoom.build`.
+
+The loaders (`loadyaml`, `loadtxt`, `loadraw`, `loadvalues`) report every file they
+load, including the ones served from the caches, to all the active recordings. The
+files loaded outside of any recording, e.g. while importing the components, are
+collected in `shared`.
+
+The YAML directives are reported as `(path, directive, static)`, i.e. the arguments
+of `loadyaml`, so that only the pages using the edited directives of a file have to
+be rendered again.
+
+Example:
+    >>> from htmldoom.deps import recording
+    >>>
+    >>> with recording() as files:
+    ...     render(page())
+    >>> files
+    {('components/page.yml', ('page',), False), 'values/title.txt'}
+"""
+
+from contextlib import contextmanager
+
+__all__ = ["record", "recording", "is_recording", "shared"]
+
+_recordings = []
+
+# The files loaded outside of any recording.
+shared = set()
+
+
+def record(path, directive=None, static=False):
+    """Report a loaded file (or a scanned directory) to the active recordings.
+
+    Pass the `directive` if only a YAML directive of the file was loaded.
+    """
+    dep = path if directive is None else (path, directive, static)
+    if not _recordings:
+        shared.add(dep)
+        return
+    for files in _recordings:
+        files.add(dep)
+
+
+def is_recording():
+    """Check if some recording is active, e.g. to report the memoized loads too."""
+    return bool(_recordings)
+
+
+@contextmanager
+def recording():
+    """Collect the files loaded in the context into a set."""
+    files = set()
+    _recordings.append(files)
+    try:
+        yield files
+    finally:
+        _recordings.remove(files)
@@ -0,0 +1,172 @@
+"""Compute the ETags of the rendered output, for the conditional GET requests.
+
+The strong ETags are content hashes, computed incrementally over the chunks while
+rendering or streaming, without a second pass over the rendered page.
+
+The `@renders` components can also derive a weak ETag from the identity of the
+template and the values of its slots, with `component.etag(...)`, without rendering
+anything. Hence, a `304 Not Modified` can be answered before producing any markup.
+Only the plain values (`str`, `bytes`, numbers, fragments and tuples, lists or
+dicts of them) are hashed. Otherwise, e.g. for the lazy values or the objects whose
+attributes are used by the template, `None` is returned and the page has to be
+rendered.
+
+Example:
+    >>> from htmldoom.etag import matches, render_etag
+    >>>
+    >>> def app(environ, start_response):
+    ...     data = page_data()
+    ...     etag = page.etag(data)
+    ...     if matches(environ.get("HTTP_IF_NONE_MATCH"), etag):
+    ...         start_response("304 Not Modified", [("ETag", etag)])
+    ...         return []
+    ...     start_response("200 OK", [("ETag", etag)])
+    ...     return [page(data)]
+"""
+
+import struct
+from hashlib import blake2b
+from weakref import WeakKeyDictionary
+
+from htmldoom.fragment import Fragment, fragment
+from htmldoom.template import _missing
+
+__all__ = ["ETagIter", "render_etag", "slots_etag", "matches"]
+
+# Tell the types apart, the fragments rendering the same as the bytes.
+_TYPES = {str: b"s", bytes: b"b", Fragment: b"b", int: b"i", float: b"f", bool: b"?"}
+
+# The identities of the templates: {template: hash}
+_identities = WeakKeyDictionary()
+
+
+def _hasher():
+    return blake2b(digest_size=16)
+
+
+def _strong(hasher):
+    return f'"{hasher.hexdigest()}"'
+
+
+class ETagIter:
+    """Iterate over the chunks, e.g. of `render_iter()`, hashing them on the way.
+
+    The strong `etag` is available once all the chunks are consumed, e.g. to send
+    it in the trailers or to store it along with a cached response.
+
+    Example:
+        >>> chunks = ETagIter(render_iter(page()))
+        >>> body = b"".join(chunks)
+        >>> chunks.etag
+        '"3f2a..."'
+    """
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.etag = None
+        self._hasher = _hasher()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            c = next(self.chunks)
+        except StopIteration:
+            if self.etag is None:
+                self.etag = _strong(self._hasher)
+            raise
+        self._hasher.update(c)
+        return c
+
+
+def render_etag(*elements):
+    """Render DOM elements into bytes along with their strong ETag.
+
+    Example:
+        >>> render_etag(e.p()("x"))
+        (b'<p>x</p>', '"70ea6ab1d4e8a9e4b3b1e5e29f3e1d4a"')
+    """
+    hasher = _hasher()
+    chunks = list(fragment(*elements).stream())
+    for c in chunks:
+        hasher.update(c)
+    return b"".join(chunks), _strong(hasher)
+
+
+def _feed(hasher, value):
+    """Hash a plain value unambiguously, or return False if it's not plain."""
+    kind = type(value)
+    if kind is str:
+        data = value.encode()
+    elif kind is bytes:
+        data = value
+    elif kind in (int, float, bool) or value is None:
+        data = repr(value).encode()
+    elif kind is Fragment:
+        if type(value.chunks) is not tuple:
+            # Lazy, can't be hashed without consuming it.
+            return False
+        data = bytes(value)
+    elif isinstance(value, (tuple, list)):
+        # Formatted differently, e.g. `[1]`, `(1,)` or `Point(x=1)`.
+        hasher.update(b"%s%d:" % (kind.__qualname__.encode(), len(value)))
+        return all(_feed(hasher, v) for v in value)
+    elif kind is dict:
+        hasher.update(b"dict%d:" % len(value))
+        return all(_feed(hasher, k) and _feed(hasher, v) for k, v in value.items())
+    else:
+        return False
+    hasher.update(_TYPES.get(kind, b"n") + struct.pack("<Q", len(data)))
+    hasher.update(data)
+    return True
+
+
+def slots_etag(template, data):
+    """Derive a weak ETag from the identity of a template and its slot values.
+
+    Returns `None` if some of the values can't be hashed without rendering them.
+
+    Example:
+        >>> slots_etag(Template("<p>{x}</p>"), {"x": "foo"})
+        'W/"5b1e..."'
+    """
+    try:
+        identity = _identities[template]
+    except KeyError:
+        identity = _identities[template] = blake2b(
+            template.source.encode(), digest_size=16
+        ).digest()
+
+    hasher = _hasher()
+    hasher.update(identity)
+    for name in template.fields:
+        try:
+            value = data[name]
+        except KeyError:
+            _missing(template.fields, data)
+            raise
+        if not _feed(hasher, value):
+            return None
+    return f"W/{_strong(hasher)}"
+
+
+def matches(if_none_match, etag):
+    """Check if an ETag matches the `If-None-Match` header, i.e. not modified.
+
+    Like the servers must for `If-None-Match`, the weak comparison is used.
+
+    Example:
+        >>> matches('W/"abc", "def"', '"abc"')
+        True
+    """
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    etag = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith("W/") else tag) == etag:
+            return True
+    return False
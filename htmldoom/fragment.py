@@ -0,0 +1,158 @@
+"""Lazily joined chunks of rendered HTML.
+
+Composite tags don't copy their children into a new `bytes` object. Instead they
+return a `Fragment` that keeps references to the already rendered chunks. The
+chunks are joined only once, when the outermost element gets rendered, no matter
+how deeply the elements are nested.
+
+Iterators (e.g. generators) are kept as they are and rendered lazily, only when the
+fragment is rendered or streamed. So are the awaitables and the async iterators,
+which can only be rendered with `htmldoom.aio`.
+
+Example:
+    >>> from htmldoom import elements as e
+    >>>
+    >>> frag = e.div()(e.p()("x"))
+    >>> frag
+    Fragment(b'<div><p>x</p></div>')
+    >>> bytes(frag)
+    b'<div><p>x</p></div>'
+"""
+
+from html import escape
+
+try:
+    from collections.abc import AsyncIterable, Awaitable, Iterator
+except ImportError:  # pragma: no cover
+    from collections import AsyncIterable, Awaitable, Iterator
+
+__all__ = ["Fragment", "chunk", "fragment"]
+
+_STREAMED = object()
+
+
+class Fragment:
+    """An immutable sequence of raw HTML chunks (`bytes` or other fragments).
+
+    It behaves like `bytes` wherever it matters for htmldoom: it's never escaped,
+    compares equal to the `bytes` it renders into and can be concatenated.
+
+    The chunks can also be an iterator of elements, which are rendered lazily, or
+    an awaitable or async iterable, which are rendered by `htmldoom.aio`.
+    """
+
+    __slots__ = ("chunks", "_hash")
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __iter__(self):
+        """Yield the chunks in order. The lazy chunks are rendered only once."""
+        return _walk(self, memoize=True)
+
+    def stream(self):
+        """Yield the chunks in order without holding on to the lazy chunks.
+
+        Hence, streaming a fragment with lazy chunks is possible only once.
+        """
+        return _walk(self, memoize=False)
+
+    def __bytes__(self):
+        return b"".join(self)
+
+    def decode(self, encoding="utf-8", errors="strict"):
+        return bytes(self).decode(encoding, errors)
+
+    def __eq__(self, other):
+        if isinstance(other, (bytes, Fragment)):
+            return bytes(self) == bytes(other)
+        return NotImplemented
+
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(bytes(self))
+            return self._hash
+
+    def __add__(self, other):
+        if isinstance(other, (bytes, Fragment)):
+            return Fragment((self, other))
+        return NotImplemented
+
+    def __radd__(self, other):
+        if isinstance(other, (bytes, Fragment)):
+            return Fragment((other, self))
+        return NotImplemented
+
+    def __repr__(self):
+        return f"{type(self).__name__}({bytes(self)!r})"
+
+    def __reduce__(self):
+        # Pickled rendered, the lazy chunks (e.g. generators) can't be pickled.
+        return (type(self), ((bytes(self),),))
+
+
+def _chunks(frag, memoize):
+    chunks = frag.chunks
+    if type(chunks) is tuple:
+        return chunks
+    if chunks is _STREAMED:
+        raise ValueError(
+            "This fragment has already been streamed. The fragments having lazy"
+            " elements (e.g. generators) can be streamed only once."
+        )
+    if not isinstance(chunks, Iterator):
+        raise ValueError(
+            f"{chunks}: awaitables and async iterators can only be rendered"
+            " asynchronously. Use `htmldoom.aio.async_render()` instead."
+        )
+    if memoize:
+        frag.chunks = chunks = tuple(map(chunk, chunks))
+        return chunks
+    frag.chunks = _STREAMED
+    return map(chunk, chunks)
+
+
+def _walk(frag, memoize):
+    """Walk the nested chunks without recursion and yield them in order."""
+    stack = [iter(_chunks(frag, memoize))]
+    while stack:
+        for c in stack[-1]:
+            if isinstance(c, Fragment):
+                stack.append(iter(_chunks(c, memoize)))
+                break
+            yield c
+        else:
+            stack.pop()
+
+
+def chunk(el):
+    """Convert an element into raw HTML i.e. `bytes` or `Fragment`.
+
+    Example:
+        >>> chunk("<p></p>")
+        b'&lt;p&gt;&lt;/p&gt;'
+    """
+    while callable(el):
+        # Forgot to call with no arguments? no worries...
+        el = el()
+    if isinstance(el, (bytes, Fragment)):
+        return el
+    if isinstance(el, str):
+        return escape(el).encode()
+    if isinstance(el, (Iterator, Awaitable, AsyncIterable)):
+        return Fragment(el)
+    raise ValueError(
+        f"{el}: expected either of str, bytes, or a callable but got {type(el)}"
+    )
+
+
+def fragment(*elements):
+    """Join the given elements lazily into a fragment.
+
+    Example:
+        >>> fragment("<", b"<br />")
+        Fragment(b'&lt;<br />')
+    """
+    return Fragment(tuple(map(chunk, elements)))
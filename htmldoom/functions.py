@@ -21,9 +21,9 @@ Example:
     ...         fn.Case.DEFAULT: lambda: fn.Error.throw(ValueError(x)),
     ...     })
     ... ))
-    (b'<span style="color: green">this is good</span>',
-     b'<span style="color: yellow">this is bad</span>',
-     b'<span style="color: red">this is evil</span>')
+    (Fragment(b'<span style="color: green">this is good</span>'),
+     Fragment(b'<span style="color: yellow">this is bad</span>'),
+     Fragment(b'<span style="color: red">this is evil</span>'))
 """
 
 
@@ -60,6 +60,9 @@ def switch(cases):
 
 def foreach(data):
     """A foreach function to make map() look a little nicer.
+
+    To render many rows of the same component, `@renders(...)` components provide
+    the much faster `component.rows(dataset)`.
     
     Example:
         >>> list(foreach([1, 2, 4])(lambda n: n * 2))
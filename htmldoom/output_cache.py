@@ -0,0 +1,315 @@
+"""Cache the rendered output of the `@renders` components.
+
+The output is cached on a key derived from the values of the template fields in the
+returned data, or from the arguments of the component with a `key` function, in
+which case the component isn't even called on a hit. The entries expire after the
+`ttl`, and can be invalidated by the arguments of the component, or by tags.
+
+Invalidating a tag doesn't look for the entries to delete. Every tag has a
+generation counter, which is a part of the keys of the entries. Hence, bumping it
+makes the entries unreachable and they're eventually evicted.
+
+The outputs are kept by a backend:
+
+- `MemoryBackend` (default): in a `CacheManager`, the shared one by default, so that
+  they're bounded by the same memory budget as the other caches of htmldoom.
+- `MmapBackend`: in a fixed size shared memory map, which the workers forked after
+  creating it (e.g. by `htmldoom.parallel.render_many`) share.
+
+Example:
+    >>> from htmldoom.output_cache import OutputCache
+    >>>
+    >>> sidebars = OutputCache(ttl=60, key=lambda user: user.id, tags=["sidebar"])
+    >>>
+    >>> @renders(e.aside()("{name}"), cache=sidebars)
+    ... def sidebar(user):
+    ...     return {"name": user.name}
+    >>>
+    >>> sidebar(user)  # Rendered
+    b'<aside>foo</aside>'
+    >>> sidebar(user)  # Cached
+    b'<aside>foo</aside>'
+    >>> sidebar.invalidate(user)  # Only this one
+    >>> sidebars.invalidate("sidebar")  # All the entries tagged "sidebar"
+"""
+
+import mmap
+import struct
+from collections import Counter
+from hashlib import blake2b
+from threading import RLock
+from time import monotonic
+from zlib import crc32
+
+try:
+    from collections.abc import AsyncIterable, Awaitable, Iterator
+except ImportError:  # pragma: no cover
+    from collections import AsyncIterable, Awaitable, Iterator
+
+from htmldoom.cache import cache_manager
+from htmldoom.etag import _feed
+from htmldoom.fragment import Fragment
+
+__all__ = ["OutputCache", "MemoryBackend", "MmapBackend"]
+
+
+class MemoryBackend:
+    """Keep the outputs in a `CacheManager`, the shared one by default.
+
+    For separate bounds, pass a dedicated manager, e.g.
+    `MemoryBackend(CacheManager(maxbytes=1024 * 1024, maxsize=1000, policy=LRU()))`.
+    Note that the outputs bigger than the `max_entry_bytes` of the manager are not
+    cached.
+    """
+
+    def __init__(self, manager=None):
+        self.manager = cache_manager if manager is None else manager
+        self.generations = Counter()
+
+    def get(self, key):
+        entry = self.manager.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires is not None and expires < monotonic():
+            self.delete(key)
+            return None
+        return value
+
+    def set(self, key, value, ttl=None):
+        expires = None if ttl is None else monotonic() + ttl
+        self.manager.set(key, (expires, value))
+
+    def delete(self, key):
+        self.manager.delete(key)
+
+    def clear(self, name):
+        self.manager.clear(name)
+
+    def generation(self, tag):
+        return self.generations[tag]
+
+    def bump(self, tag):
+        self.generations[tag] += 1
+
+
+# The header of the slots: key digest, expiry time, checksum, length
+_SLOT = struct.Struct("16sdII")
+_GENERATION = struct.Struct("Q")
+
+
+def _digest(key):
+    """Hash a key the same way in every process, or return `None` if it can't.
+
+    Unlike pickling, it only depends on the values, not on the objects holding them.
+    """
+    hasher = blake2b(digest_size=16)
+    if not _feed(hasher, key):
+        return None
+    return hasher.digest()
+
+
+class MmapBackend:
+    """Keep the outputs in a shared memory map, with a fixed number of slots.
+
+    Every key maps to a single slot, and a new entry replaces the one in its slot.
+    The outputs bigger than the slots are not cached. The map is anonymous by
+    default, i.e. only shared with the processes forked after creating it. Pass a
+    `path` to share it with any process mapping the same file.
+
+    Reading and writing is lock free. The entries getting overwritten while being
+    read fail the checksum, and are treated as missing.
+
+    The keys, and the tags, can only be made of `str`, `bytes`, numbers and
+    tuples of them, so that they're hashed the same in every process. The entries
+    with other keys are not cached.
+
+    Arguments:
+        slots (int): The number of entries the map can hold.
+        slot_size (int): The maximum size of an entry, including a 32 bytes header.
+        path (str): A file to map, created or resized if needed.
+        tags (int): The number of generation counters, shared by all the tags.
+    """
+
+    def __init__(self, slots=4096, slot_size=16 * 1024, path=None, tags=1024):
+        self.slots = slots
+        self.slot_size = slot_size
+        self.tags = tags
+        self._offset = tags * _GENERATION.size
+        size = self._offset + slots * slot_size
+        if path is None:
+            self.map = mmap.mmap(-1, size)
+        else:
+            with open(path, "a+b") as f:
+                if f.seek(0, 2) < size:
+                    f.truncate(size)
+                self.map = mmap.mmap(f.fileno(), size)
+
+    def _slot(self, digest):
+        index = int.from_bytes(digest[:8], "little") % self.slots
+        return self._offset + index * self.slot_size
+
+    def get(self, key):
+        digest = _digest(key)
+        if digest is None:
+            return None
+        offset = self._slot(digest)
+        stored, expires, checksum, length = _SLOT.unpack_from(self.map, offset)
+        if stored != digest:
+            return None
+        start = offset + _SLOT.size
+        value = self.map[start : start + length]
+        if crc32(value) != checksum or len(value) != length:
+            return None
+        if expires and expires < monotonic():
+            return None
+        return value
+
+    def set(self, key, value, ttl=None):
+        digest = _digest(key)
+        if digest is None or _SLOT.size + len(value) > self.slot_size:
+            return
+        offset = self._slot(digest)
+        expires = 0.0 if ttl is None else monotonic() + ttl
+        # Invalidate the slot before overwriting, then publish the header.
+        self.map[offset : offset + 16] = bytes(16)
+        start = offset + _SLOT.size
+        self.map[start : start + len(value)] = value
+        _SLOT.pack_into(self.map, offset, digest, expires, crc32(value), len(value))
+
+    def delete(self, key):
+        digest = _digest(key)
+        if digest is None:
+            return
+        offset = self._slot(digest)
+        if self.map[offset : offset + 16] == digest:
+            self.map[offset : offset + 16] = bytes(16)
+
+    def clear(self, name=None):
+        # The keys can't be listed, hence it clears the entries of all the names.
+        for offset in range(self._offset, len(self.map), self.slot_size):
+            self.map[offset : offset + 16] = bytes(16)
+
+    def _counter(self, tag):
+        digest = _digest(tag)
+        if digest is None:
+            raise TypeError(f"{tag!r}: expected str, bytes, numbers or tuples of them.")
+        index = int.from_bytes(digest[:8], "little")
+        return (index % self.tags) * _GENERATION.size
+
+    def generation(self, tag):
+        return _GENERATION.unpack_from(self.map, self._counter(tag))[0]
+
+    def bump(self, tag):
+        offset = self._counter(tag)
+        (generation,) = _GENERATION.unpack_from(self.map, offset)
+        _GENERATION.pack_into(self.map, offset, (generation + 1) % 2**64)
+
+
+def _lazy(value):
+    """Check if a value would be consumed by rendering it, or change on every call.
+
+    Caching them by identity would only pin them in memory without ever being hit.
+    """
+    if type(value) is Fragment:
+        return type(value.chunks) is not tuple
+    return isinstance(value, (Iterator, Awaitable, AsyncIterable)) or callable(value)
+
+
+def _values_key(values):
+    """Key the slot values by their types too, since e.g. `1 == True == 1.0`.
+
+    The plain values are hashed like for the weak ETags, nested ones included.
+    """
+    hasher = blake2b(digest_size=16)
+    if _feed(hasher, values):
+        return hasher.digest()
+    for value in values:
+        if _lazy(value):
+            raise TypeError(f"{value!r}: lazy values can't be cached.")
+    return tuple((type(value).__qualname__, value) for value in values)
+
+
+class OutputCache:
+    """The cache of the rendered output of `@renders` components.
+
+    An instance can be shared by many components, e.g. to invalidate their common
+    tags at once.
+
+    Arguments:
+        backend: `MemoryBackend()` (default) or `MmapBackend()`.
+        ttl (float): Seconds to keep the entries for. Forever by default.
+        key: A function deriving a hashable key from the arguments of the
+            components. By default, the key is derived from the values of the
+            template fields in the returned data.
+        tags: The tags of the entries, or a function deriving them from the
+            arguments of the components.
+    """
+
+    def __init__(self, backend=None, ttl=None, key=None, tags=()):
+        self.backend = MemoryBackend() if backend is None else backend
+        self.ttl = ttl
+        self.key = key
+        self.tags = tags
+        self.names = set()
+        self._lock = RLock()
+
+    def register(self, func, template):
+        """Register a component, returning its name and identity in the keys.
+
+        The components having the same name are told apart by their modules and
+        the sources of their templates.
+        """
+        name = f"renders:{func.__qualname__}"
+        self.names.add(name)
+        source = blake2b(template.source.encode(), digest_size=16).hexdigest()
+        return name, (func.__module__, source)
+
+    def _key(self, component, template, data, args, kwargs):
+        tags = self.tags(*args, **kwargs) if callable(self.tags) else self.tags
+        if self.key is not None:
+            key = self.key(*args, **kwargs)
+        else:
+            key = _values_key(tuple(data[f] for f in template.fields))
+        generations = tuple((t, self.backend.generation(t)) for t in tags)
+        key = (*component, key, generations)
+        hash(key)
+        return key
+
+    def render(self, component, template, func, args, kwargs):
+        """Render a component, or get its output from the cache."""
+        data = None if self.key is not None else func(*args, **kwargs)
+        try:
+            key = self._key(component, template, data, args, kwargs)
+        except (TypeError, KeyError):
+            # Unhashable, lazy or missing values, rendered uncached (or failing).
+            return template.render(func(*args, **kwargs) if data is None else data)
+
+        value = self.backend.get(key)
+        if value is None:
+            if data is None:
+                data = func(*args, **kwargs)
+            value = template.render(data)
+            self.backend.set(key, value, self.ttl)
+        return value
+
+    def forget(self, component, template, func, args, kwargs):
+        """Invalidate the output of a component for the given arguments."""
+        data = None if self.key is not None else func(*args, **kwargs)
+        try:
+            key = self._key(component, template, data, args, kwargs)
+        except TypeError:
+            # Never cached.
+            return
+        self.backend.delete(key)
+
+    def invalidate(self, *tags):
+        """Invalidate all the entries having any of the tags."""
+        with self._lock:
+            for tag in tags:
+                self.backend.bump(tag)
+
+    def clear(self):
+        """Clear the entries of all the components using this cache."""
+        for name in list(self.names):
+            self.backend.clear(name)
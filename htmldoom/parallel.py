@@ -0,0 +1,97 @@
+"""Render independent pages or fragments in parallel, in a pool of processes.
+
+The jobs are callables returning the elements to render. Since they are sent to
+the worker processes, they must be picklable, e.g. module level functions or
+`functools.partial` objects of them. The fragments, the templates and the
+`@renders` components defined at the module level are picklable too.
+
+Where `fork` is available, the workers are forked after running the `warmup`
+callable in the main process. Hence, the warmed up caches (e.g. the compiled
+templates and the loaded YAML components) are shared copy-on-write instead of being
+rebuilt by every worker.
+
+Example:
+    >>> from functools import partial
+    >>> from htmldoom.parallel import render_many
+    >>>
+    >>> def page(name):
+    ...     return e.html()(e.body()(e.h1()(name)))
+    >>>
+    >>> for html in render_many(partial(page, n) for n in ("foo", "bar")):
+    ...     print(html)
+    <html><body><h1>foo</h1></body></html>
+    <html><body><h1>bar</h1></body></html>
+"""
+
+import gc
+import multiprocessing
+
+from htmldoom.util import render
+
+__all__ = ["render_many"]
+
+
+def _render_job(job):
+    return render(job())
+
+
+def _render_indexed_job(indexed_job):
+    index, job = indexed_job
+    return index, render(job())
+
+
+def _context():
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def render_many(jobs, workers=None, ordered=True, warmup=None):
+    """Render the elements returned by the jobs in a pool of processes.
+
+    Arguments:
+        jobs: Picklable callables returning the elements to render.
+        workers (int): The number of processes, defaults to the number of CPUs.
+            With a single worker, the jobs are rendered in the current process.
+        ordered (bool): Yield the rendered jobs in order. Otherwise, yield
+            `(index, html)` pairs as soon as each of the jobs is rendered.
+        warmup: A callable to fill the caches before rendering. It's run once in
+            the main process before forking, or in every worker if forking is not
+            supported, in which case it must be picklable too.
+
+    Example:
+        >>> list(render_many([partial(page, "foo"), partial(page, "bar")], workers=2))
+        ['<html><body><h1>foo</h1></body></html>',
+         '<html><body><h1>bar</h1></body></html>']
+    """
+    if workers == 1:
+        if warmup is not None:
+            warmup()
+        for index, job in enumerate(jobs):
+            yield _render_job(job) if ordered else (index, _render_job(job))
+        return
+
+    context = _context()
+    if context.get_start_method() == "fork":
+        if warmup is not None:
+            warmup()
+        initializer = None
+    else:
+        initializer = warmup
+
+    # Keep the collector away from the warmed up objects in the workers, or it
+    # would touch and hence copy their memory pages.
+    freeze = getattr(gc, "freeze", None)
+    if freeze is not None:
+        freeze()
+    try:
+        pool = context.Pool(workers, initializer=initializer)
+    finally:
+        if freeze is not None:
+            gc.unfreeze()
+
+    with pool:
+        if ordered:
+            yield from pool.imap(_render_job, jobs)
+        else:
+            yield from pool.imap_unordered(_render_indexed_job, enumerate(jobs))
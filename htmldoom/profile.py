@@ -0,0 +1,226 @@
+"""Profile the rendering per `@renders` component and per tag.
+
+The profiler hooks into the interpreter (see `sys.setprofile()`) only while it's
+running, so the rendering code has no checks whatsoever and costs nothing extra when
+not profiled. It records the wall time, the calls, the size of the output and the
+cache hit ratio of every component and tag, and the time spent in every stack of
+components and tags, as collapsed stacks for the flame graph tools (e.g.
+`flamegraph.pl` or speedscope).
+
+To profile the whole process, set the `HTMLDOOM_PROFILE` environment variable to
+the path of the collapsed stacks file to write at exit.
+
+Example:
+    >>> from htmldoom.profile import profile
+    >>>
+    >>> with profile() as prof:
+    ...     render(page())
+    >>> prof.stats()["components"]["sidebar"]
+    {'calls': 1, 'time': 0.0004, 'bytes': 2210, 'hits': 0, 'misses': 1, 'hit_ratio': 0.0}
+    >>> print(prof.collapsed())
+    page;sidebar;<ul> 31
+    page;sidebar 104
+    page 212
+"""
+
+import atexit
+import sys
+import threading
+from collections import defaultdict
+from time import perf_counter
+
+from htmldoom import base, util
+from htmldoom.cache import cache_manager
+from htmldoom.fragment import Fragment
+
+__all__ = ["Profiler", "profile"]
+
+_FILES = {util.__file__: "component", base.__file__: "tag"}
+
+
+def _component(frame):
+    return "renders", frame.f_locals["func"].__qualname__
+
+
+def _tag(frame):
+    local = frame.f_locals
+    kind = "composite_tag" if "closing" in local else "leaf_tag"
+    return kind, local["tagname"]
+
+
+def _children(frame):
+    return "composite_tag", frame.f_locals["self"].closing[2:-1].decode()
+
+
+def _identify(code):
+    """Find how to name the frames of a code object, if they need profiling."""
+    kind = _FILES.get(code.co_filename)
+    if kind == "component" and code.co_name in ("renderer", "fragment", "iter_"):
+        if "func" in code.co_freevars:
+            return _component
+    elif kind == "tag" and code.co_name == "set_props":
+        return _tag
+    elif kind == "tag" and code.co_name == "__call__":
+        return _children
+    return None
+
+
+def _size(output):
+    """The size of the rendered output, leaving the lazy chunks unconsumed."""
+    if type(output) is bytes:
+        return len(output)
+    if type(output) is not Fragment or type(output.chunks) is not tuple:
+        return 0
+    return sum(map(_size, output.chunks))
+
+
+def _threads_profile():
+    """The profile function set for the new threads, see `threading.setprofile()`."""
+    try:
+        return threading.getprofile()
+    except AttributeError:  # Python < 3.10
+        return threading._profile_hook
+
+
+class Profiler:
+    """Collect the timings of the components and the tags rendered in all threads."""
+
+    def __init__(self):
+        # {(kind, name): [calls, time, bytes]}
+        self.totals = defaultdict(lambda: [0, 0.0, 0])
+        # {stack: self time}
+        self.stacks = defaultdict(float)
+        self._codes = {}
+        self._local = threading.local()
+        self._previous = None
+        self._threads_previous = None
+        self._active = False
+        self._cache_stats = None
+
+    def start(self):
+        self._previous = sys.getprofile()
+        self._threads_previous = _threads_profile()
+        self._cache_stats = cache_manager.stats()
+        self._active = True
+        threading.setprofile(self._hook)
+        sys.setprofile(self._hook)
+
+    def stop(self):
+        # The threads started meanwhile uninstall the hook on their next call.
+        self._active = False
+        sys.setprofile(self._previous)
+        threading.setprofile(self._threads_previous)
+        before, zero = self._cache_stats, dict(hits=0, misses=0)
+        self._cache_stats = {
+            name: (
+                stats["hits"] - before.get(name, zero)["hits"],
+                stats["misses"] - before.get(name, zero)["misses"],
+            )
+            for name, stats in cache_manager.stats().items()
+        }
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _hook(self, frame, event, arg):
+        if not self._active:
+            sys.setprofile(None)
+            return
+        if event == "call":
+            code = frame.f_code
+            try:
+                identify = self._codes[code]
+            except KeyError:
+                identify = self._codes[code] = _identify(code)
+            if identify is None:
+                return
+            try:
+                stack = self._local.stack
+            except AttributeError:
+                stack = self._local.stack = []
+            path = identify(frame)
+            if stack:
+                path = (*stack[-1][1], path)
+            else:
+                path = (path,)
+            stack.append([frame, path, perf_counter(), 0.0])
+
+        elif event == "return":
+            stack = getattr(self._local, "stack", None)
+            if not stack or stack[-1][0] is not frame:
+                return
+            _, path, start, children = stack.pop()
+            elapsed = perf_counter() - start
+            if stack:
+                stack[-1][3] += elapsed
+            self.stacks[path] += elapsed - children
+            total = self.totals[path[-1]]
+            total[1] += elapsed
+            size = _size(arg)
+            if size or type(arg) in (bytes, Fragment):
+                # Not counting the tags returning the setter of their children.
+                total[0] += 1
+                total[2] += size
+
+    def stats(self):
+        """The calls, wall time, bytes and cache hits of the components and tags."""
+        result = dict(components={}, tags={})
+        for (kind, name), (calls, time, nbytes) in self.totals.items():
+            hits, misses = (self._cache_stats or {}).get(f"{kind}:{name}", (0, 0))
+            group = result["components" if kind == "renders" else "tags"]
+            old = group.get(name, dict(calls=0, time=0.0, bytes=0, hits=0, misses=0))
+            group[name] = dict(
+                calls=old["calls"] + calls,
+                time=old["time"] + time,
+                bytes=old["bytes"] + nbytes,
+                hits=old["hits"] + hits,
+                misses=old["misses"] + misses,
+            )
+        for group in result.values():
+            for stats in group.values():
+                lookups = stats["hits"] + stats["misses"]
+                stats["hit_ratio"] = stats["hits"] / lookups if lookups else None
+        return result
+
+    def collapsed(self):
+        """The self time of every stack in microseconds, as collapsed stacks."""
+        lines = []
+        for path, time in sorted(self.stacks.items()):
+            micros = round(time * 1e6)
+            if micros > 0:
+                names = (n if k == "renders" else f"<{n}>" for k, n in path)
+                lines.append(f"{';'.join(names)} {micros}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def dump(self, path):
+        """Write the collapsed stacks into a file."""
+        with open(path, "w") as f:
+            f.write(self.collapsed())
+
+
+def profile():
+    """Profile the rendering in the context.
+
+    Example:
+        >>> with profile() as prof:
+        ...     render(page())
+        >>> prof.dump("render.folded")
+    """
+    return Profiler()
+
+
+def _profile_process(path):
+    """Profile the whole process, and dump the collapsed stacks at exit."""
+    profiler = Profiler()
+    profiler.start()
+
+    def dump():
+        profiler.stop()
+        profiler.dump(path)
+
+    atexit.register(dump)
+    return profiler
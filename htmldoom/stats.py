@@ -0,0 +1,128 @@
+"""Inspect the caches, e.g. for a metrics endpoint.
+
+Every cache registered in the `cache_manager` (see `htmldoom.cache.cached`) reports
+its hits, misses, evictions (including the expired entries), current entries and the
+approximate bytes held. The tags have one cache each, named `composite_tag:<tag>` or
+`leaf_tag:<tag>`, and are broken down per tag too. Their memoized `class_` only
+variants bypass the shared cache to stay fast (see `CacheManager.memos`), and are
+reported by their entries and bytes only.
+
+Example:
+    >>> from htmldoom import stats
+    >>>
+    >>> stats.as_dict()["tags"]["div"]
+    {'hits': 12, 'misses': 2, 'evictions': 0, 'entries': 2, 'bytes': 412, ...}
+    >>> print(stats.as_prometheus())
+    # HELP htmldoom_cache_hits_total The lookups found in the cache.
+    # TYPE htmldoom_cache_hits_total counter
+    htmldoom_cache_hits_total{cache="composite_tag:div"} 12
+    ...
+"""
+
+from htmldoom.cache import _sizeof, cache_manager
+
+__all__ = ["caches", "tags", "as_dict", "as_prometheus", "reset"]
+
+_TAG_CACHES = ("composite_tag", "leaf_tag")
+
+# The exported metrics: (key, name, type, help)
+_METRICS = (
+    ("hits", "cache_hits_total", "counter", "The lookups found in the cache."),
+    ("misses", "cache_misses_total", "counter", "The lookups not found in the cache."),
+    (
+        "evictions",
+        "cache_evictions_total",
+        "counter",
+        "The entries evicted or expired from the cache.",
+    ),
+    ("entries", "cache_entries", "gauge", "The entries held in the cache."),
+    ("bytes", "cache_bytes", "gauge", "The approximate bytes held in the cache."),
+    (
+        "class_entries",
+        "tag_class_entries",
+        "gauge",
+        "The memoized class_ only variants of the tag.",
+    ),
+    (
+        "class_bytes",
+        "tag_class_bytes",
+        "gauge",
+        "The approximate bytes held by the class_ only variants of the tag.",
+    ),
+)
+
+
+def _empty():
+    return dict(hits=0, misses=0, evictions=0, entries=0, bytes=0)
+
+
+def caches(manager=None):
+    """The statistics of every cache, by name."""
+    if manager is None:
+        manager = cache_manager
+    return {name: stats for name, stats in manager.stats().items() if name is not None}
+
+
+def tags(manager=None):
+    """The statistics of the caches of every tag, by tag name."""
+    if manager is None:
+        manager = cache_manager
+    result = {}
+    for name, stats in caches(manager).items():
+        kind, _, tagname = name.partition(":")
+        if kind in _TAG_CACHES and tagname:
+            result[tagname] = dict(stats, kind=kind, class_entries=0, class_bytes=0)
+
+    for name, classes in list(manager.memos.items()):
+        kind, _, tagname = name.partition(":")
+        if tagname not in result:
+            result[tagname] = dict(_empty(), kind=kind, class_entries=0, class_bytes=0)
+        items = list(classes.items())
+        result[tagname]["class_entries"] = len(items)
+        result[tagname]["class_bytes"] = sum(_sizeof(k) + _sizeof(v) for k, v in items)
+    return result
+
+
+def as_dict(manager=None):
+    """All the statistics, along with the totals and the limits of the manager."""
+    if manager is None:
+        manager = cache_manager
+    result = dict(caches=caches(manager), tags=tags(manager))
+    total = _empty()
+    for stats in result["caches"].values():
+        for key in total:
+            total[key] += stats[key]
+    total.update(maxbytes=manager.maxbytes, maxsize=manager.maxsize)
+    result["total"] = total
+    return result
+
+
+def _label(value):
+    value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return value.replace("\n", "\\n")
+
+
+def as_prometheus(manager=None, prefix="htmldoom"):
+    """All the statistics in the Prometheus text exposition format."""
+    result = caches(manager)
+    per_tag = tags(manager)
+    lines = []
+    for key, name, type_, help_ in _METRICS:
+        if key.startswith("class_"):
+            samples = [
+                ("tag", tagname, stats[key]) for tagname, stats in per_tag.items()
+            ]
+        else:
+            samples = [("cache", cache, stats[key]) for cache, stats in result.items()]
+        lines.append(f"# HELP {prefix}_{name} {help_}")
+        lines.append(f"# TYPE {prefix}_{name} {type_}")
+        for label, value, sample in sorted(samples):
+            lines.append(f'{prefix}_{name}{{{label}="{_label(value)}"}} {sample}')
+    return "\n".join(lines) + "\n"
+
+
+def reset(manager=None):
+    """Reset the hits, misses and evictions counters."""
+    if manager is None:
+        manager = cache_manager
+    manager.reset_stats()
@@ -0,0 +1,357 @@
+"""Templates compiled into Python code for the `@renders` decorator.
+
+A template is a `str.format` style string, i.e. the rendered components with
+`{placeholders}` in them. Instead of calling `str.format()` on every render, it gets
+split once into static byte segments and slots, and compiled into a function that
+only has to escape the slot values and join everything in a single pass.
+
+Example:
+    >>> from htmldoom.template import Template
+    >>>
+    >>> para = Template("<p>{x}</p>")
+    >>> print(para.code)
+    def render(data):
+        try:
+            _0 = _slot(data['x'])
+        except KeyError:
+            _missing(('x',), data)
+            raise
+        return b''.join((b'<p>', _0, b'</p>'))
+    <BLANKLINE>
+    <BLANKLINE>
+    def fragment(data):
+        try:
+            _0 = _chunk(data['x'])
+        except KeyError:
+            _missing(('x',), data)
+            raise
+        return _Fragment((b'<p>', _0, b'</p>'))
+    <BLANKLINE>
+    >>> para({"x": "&"})
+    b'<p>&amp;</p>'
+"""
+
+from _string import formatter_field_name_split
+from html import escape
+from string import Formatter
+
+try:
+    from collections.abc import AsyncIterable, Awaitable, Iterator
+except ImportError:  # pragma: no cover
+    from collections import AsyncIterable, Awaitable, Iterator
+
+from htmldoom.fragment import Fragment, chunk
+
+__all__ = ["Template"]
+
+_LAZY = (Fragment, Iterator, Awaitable, AsyncIterable)
+
+
+def _slot(value):
+    """Render a slot value into bytes, escaping it only if it's `str`."""
+    if isinstance(value, str):
+        return escape(value).encode()
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, _LAZY) or callable(value):
+        return bytes(chunk(value))
+    return format(value).encode()
+
+
+def _chunk(value):
+    """Like `_slot()`, but keeps the fragments and the lazy values lazy."""
+    if isinstance(value, (str, bytes)) or isinstance(value, _LAZY) or callable(value):
+        return chunk(value)
+    return format(value).encode()
+
+
+def _text(value):
+    """Render a slot value that needs further formatting into `str`."""
+    if isinstance(value, str):
+        return escape(value)
+    if isinstance(value, bytes):
+        return value.decode()
+    if isinstance(value, _LAZY) or callable(value):
+        return chunk(value).decode()
+    return value
+
+
+def _column(values):
+    """Render a whole column of slot values into bytes, escaping it in bulk."""
+    if hasattr(values, "tolist"):
+        # NumPy arrays, `array.array`, etc.
+        values = values.tolist()
+    values = list(values)
+    types = set(map(type, values))
+    if types <= {bytes}:
+        return values
+    if types <= {str}:
+        joined = escape("\0".join(values)).encode().split(b"\0")
+    elif types <= {int, float}:
+        joined = "\0".join(map(format, values)).encode().split(b"\0")
+    else:
+        return [_slot(v) for v in values]
+    if len(joined) != len(values):
+        # Some of the values contain the separator.
+        return [_slot(v) for v in values]
+    return joined
+
+
+def _columns(fields, data):
+    """Get the columns of the given fields from a dataset and count the rows."""
+    if hasattr(data, "keys"):
+        # A mapping of columns, e.g. a dict of lists or a pandas data frame.
+        missing = [f for f in fields if f not in data.keys()]
+        if missing:
+            raise KeyError(
+                f"{', '.join(missing)}: missing in the columns to render the"
+                f" template. Expected the fields: {', '.join(fields)}"
+            )
+        columns = {f: data[f] for f in fields}
+        sizes = {f: len(c) for f, c in columns.items()}
+        if len(set(sizes.values())) > 1:
+            raise ValueError(
+                "Expected the columns of the same length, got"
+                f" {', '.join(f'{f}: {n}' for f, n in sizes.items())}"
+            )
+        if not fields:
+            # Static template, rendered once per row of any column.
+            for column in data.keys():
+                return columns, len(data[column])
+        return columns, next(iter(sizes.values()), 0)
+
+    # A sequence of rows, e.g. a list of dicts.
+    rows = data if isinstance(data, (list, tuple)) else list(data)
+    try:
+        columns = {f: [row[f] for row in rows] for f in fields}
+    except KeyError:
+        for row in rows:
+            _missing(fields, row)
+        raise
+    return columns, len(rows)
+
+
+def _missing(fields, data):
+    """Raise a helpful error if some of the fields are missing in the data."""
+    missing = [f for f in fields if f not in data]
+    if missing:
+        raise KeyError(
+            f"{', '.join(missing)}: missing in the data to render the template."
+            f" Expected the fields: {', '.join(fields)}"
+        )
+
+
+def _legacy(source, data):
+    """Fallback for the templates that can't be compiled."""
+    return source.format(**{k: _text(v) for k, v in data.items()}).encode()
+
+
+_NAMESPACE = {
+    "_Fragment": Fragment,
+    "_chunk": _chunk,
+    "_slot": _slot,
+    "_text": _text,
+    "_missing": _missing,
+    "_legacy": _legacy,
+}
+
+
+def _parse(source):
+    """Split the source into literals and fields, failing early if it's invalid."""
+    parsed = []
+    for literal, field, spec, conversion in Formatter().parse(source):
+        if field is None:
+            parsed.append((literal, None))
+            continue
+        name, rest = formatter_field_name_split(field)
+        if not isinstance(name, str) or not name:
+            raise ValueError(
+                f"{source}\n^^^ `{{{field}}}`: positional fields are not supported,"
+                " name the field instead. Use `{{` and `}}` to escape `{` and `}`."
+            )
+        parsed.append((literal, (name, list(rest), spec, conversion)))
+    return parsed
+
+
+def _function(fname, fields, prepare, parts, ret):
+    """Generate the code of a function that renders the data into parts."""
+    names = {name: f"_{i}" for i, name in enumerate(fields)}
+    lines = [f"def {fname}(data):"]
+    if fields:
+        lines.append("    try:")
+        for name in fields:
+            lines.append(f"        {names[name]} = {prepare(name)}(data[{name!r}])")
+        lines.extend(
+            [
+                "    except KeyError:",
+                f"        _missing({fields!r}, data)",
+                "        raise",
+            ]
+        )
+    code = [p if kind == "static" else p.format(names[kind]) for kind, p in parts]
+    lines.append(f"    return {ret(code)}")
+    return "\n".join(lines) + "\n"
+
+
+def _tuple(code):
+    if len(code) == 1:
+        return f"({code[0]},)"
+    return f"({', '.join(code)})"
+
+
+def _join(code):
+    if not code:
+        return "b''"
+    if len(code) == 1:
+        return code[0]
+    return f"b''.join({_tuple(code)})"
+
+
+def _compile(source, names=("render", "fragment")):
+    """Generate the code of the functions to render the given template.
+
+    `render` returns the rendered bytes, whereas `fragment` returns a fragment
+    keeping the lazy values (e.g. generators) lazy. They can be given other names,
+    e.g. to generate the code of many templates in the same module.
+
+    Also returns the layout of the template, i.e. the static byte segments and the
+    field names in order, unless some field needs further formatting.
+    """
+    parsed = _parse(source)
+
+    fields, formatted, counts = [], set(), {}
+    for _, field in parsed:
+        if field is None:
+            continue
+        name, rest, spec, conversion = field
+        if name not in fields:
+            fields.append(name)
+        counts[name] = counts.get(name, 0) + 1
+        if rest or spec or conversion:
+            formatted.add(name)
+        if "{" in spec:
+            # Nested fields in the format spec, e.g. `{x:{width}}`.
+            return (
+                tuple(fields),
+                f"def {names[0]}(data):\n"
+                f"    return _legacy({source!r}, data)\n"
+                "\n\n"
+                f"def {names[1]}(data):\n"
+                f"    return _Fragment((_legacy({source!r}, data),))\n",
+                None,
+            )
+    fields = tuple(fields)
+
+    # ("static", code) or (name, code with "{}" in place of the variable)
+    parts = []
+    for literal, field in parsed:
+        if literal:
+            parts.append(("static", repr(literal.encode())))
+        if field is None:
+            continue
+        name, rest, spec, conversion = field
+        if name not in formatted:
+            parts.append((name, "{}"))
+            continue
+        expr = "{}"
+        for is_attr, key in rest:
+            expr = f"getattr({expr}, {key!r})" if is_attr else f"{expr}[{key!r}]"
+        if conversion:
+            expr = f"{dict(r='repr', s='str', a='ascii')[conversion]}({expr})"
+        parts.append((name, f"format({expr}, {spec!r}).encode()"))
+
+    def prepare_render(name):
+        return "_text" if name in formatted else "_slot"
+
+    def prepare_fragment(name):
+        if name in formatted:
+            return "_text"
+        # Lazy values can't be used more than once.
+        return "_chunk" if counts[name] == 1 else "_slot"
+
+    layout = None
+    if not formatted:
+        layout = []
+        for literal, field in parsed:
+            if literal:
+                layout.append(literal.encode())
+            if field is not None:
+                layout.append(field[0])
+        layout = tuple(layout)
+
+    return (
+        fields,
+        _function(names[0], fields, prepare_render, parts, _join)
+        + "\n\n"
+        + _function(
+            names[1],
+            fields,
+            prepare_fragment,
+            parts,
+            lambda code: f"_Fragment({_tuple(code)})",
+        ),
+        layout,
+    )
+
+
+class Template:
+    """A template compiled into a function that renders the given data to bytes.
+
+    Arguments:
+        source (str): The template with `str.format` style fields.
+
+    Like with `str.format`, the fields can access the attributes or items of the
+    values, e.g. `{v.title}` or `{v[title]}`, and have format specs. The compiled
+    code is available in the `code` attribute and the top level field names in the
+    `fields` attribute.
+
+    Calling `render(data)` returns the rendered bytes, while `fragment(data)`
+    returns a `Fragment` that can be streamed without rendering the lazy values
+    (e.g. generators) in advance.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.fields, self.code, self._layout = _compile(source)
+        namespace = dict(_NAMESPACE)
+        exec(compile(self.code, "<htmldoom template>", "exec"), namespace)
+        self.render = namespace["render"]
+        self.fragment = namespace["fragment"]
+
+    def render_rows(self, data):
+        """Render the template once per row of a dataset, all at once.
+
+        The dataset can be a sequence of rows (e.g. a list of dicts) or a mapping
+        of columns (e.g. a dict of lists, NumPy arrays or a pandas data frame).
+        Each column gets escaped in bulk and all the rows are joined into a single
+        `bytes` object, without going through the template function per row.
+
+        Example:
+            >>> row = Template("<tr><td>{name}</td><td>{age}</td></tr>")
+            >>> row.render_rows({"name": ["foo", "<bar>"], "age": [21, 42]})
+            b'<tr><td>foo</td><td>21</td></tr><tr><td>&lt;bar&gt;</td><td>42</td></tr>'
+        """
+        columns, nrows = _columns(self.fields, data)
+        layout = self._layout
+        if layout is None:
+            # Some fields need further formatting, render row by row.
+            rows = (dict(zip(columns, values)) for values in zip(*columns.values()))
+            return b"".join([self.render(row) for row in rows])
+
+        columns = {f: _column(c) for f, c in columns.items()}
+        stride = len(layout)
+        parts = list(layout) * nrows
+        for offset, part in enumerate(layout):
+            if isinstance(part, str):
+                parts[offset::stride] = columns[part]
+        return b"".join(parts)
+
+    def __call__(self, data):
+        return self.render(data)
+
+    def __reduce__(self):
+        # The compiled functions can't be pickled, compile again when unpickled.
+        return (type(self), (self.source,))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.source!r})"
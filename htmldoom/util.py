@@ -1,23 +1,34 @@
 """Some utility functions."""
 
-from functools import lru_cache
+from functools import wraps
 from html import escape
-from re import sub
 
-try:
-    from collections.abc import Iterator
-except ImportError:  # pragma: no cover
-    from collections import Iterator
+from htmldoom.attrs import fmt_props, quote
+from htmldoom.cache import cached
+from htmldoom.conf import RenderConfig
+from htmldoom.deps import record
+from htmldoom.fragment import Fragment, fragment
+from htmldoom.template import Template
 
-from htmldoom.conf import CacheConfig
+__all__ = [
+    "render",
+    "render_iter",
+    "send_asgi",
+    "renders",
+    "double_quote",
+    "fmt_prop",
+    "loadtxt",
+    "loadraw",
+]
 
-__all__ = ["render", "renders", "double_quote", "fmt_prop", "loadtxt", "loadraw"]
 
-
-@lru_cache(maxsize=CacheConfig.MAXSIZE)
 def render(*elements):
     """Use it to render DOM elements.
 
+    Only the `str` and `bytes` elements are memoized. Iterators, callables and
+    fragments are rendered afresh every time, since caching them by identity would
+    only pin them in memory without ever being hit again.
+
     Example:
         >>> from htmldoom import render
         >>> from htmldoom.elements import p
@@ -25,33 +36,102 @@ def render(*elements):
         >>> print(render(p()("render me"), p()("me too")))
         <p>render me</p><p>me too</p>
     """
+    for el in elements:
+        if not isinstance(el, (str, bytes)):
+            return _render(*elements)
+    return _render_cached(*elements)
+
+
+def _render(*elements):
     if not elements:
         return ""
+    # The chunks of nested fragments are joined only here, exactly once.
+    return bytes(fragment(*elements)).decode()
+
+
+# Too big inputs are left out by the cache manager (CacheConfig.MAX_ENTRY_BYTES).
+_render_cached = cached("render")(_render)
+
+
+def render_iter(*elements, chunk_size=None):
+    """Render DOM elements chunk by chunk, e.g. to stream a big page.
+
+    The elements are rendered while walking the DOM tree and the lazy elements
+    such as generators are never held in the memory as a whole. The small chunks
+    are merged until they reach the `chunk_size` (RenderConfig.CHUNK_SIZE by
+    default). Pass `chunk_size=0` to yield every chunk as it gets rendered.
+
+    Example (WSGI):
+        >>> def app(environ, start_response):
+        ...     start_response("200 OK", [("Content-Type", "text/html")])
+        ...     return render_iter(
+        ...         e.table()(fn.foreach(rows)(lambda r: e.tr()(e.td()(r))))
+        ...     )
+    """
+    if chunk_size is None:
+        chunk_size = RenderConfig.CHUNK_SIZE
 
-    if len(elements) == 1:
-        el = elements[0]
-        while callable(el):
-            # Forgot to call with no arguments? no worries...
-            el = el()
-        if isinstance(el, str):
-            return escape(el)
-        if isinstance(el, bytes):
-            return el.decode()
-        if isinstance(el, Iterator):
-            return render(*el)
-        raise ValueError(
-            f"{el}: expected either of str, bytes, or a callable but got {type(el)}"
-        )
-    return "".join(map(render, elements))
-
-
-@lru_cache(maxsize=CacheConfig.MAXSIZE)
-def renders(*elements):
+    chunks = fragment(*elements).stream()
+    if not chunk_size:
+        for c in chunks:
+            if c:
+                yield c
+        return
+
+    buffer, size = [], 0
+    for c in chunks:
+        buffer.append(c)
+        size += len(c)
+        if size >= chunk_size:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+async def send_asgi(send, *elements, chunk_size=None):
+    """Stream DOM elements as the body of an ASGI HTTP response.
+
+    Example (ASGI):
+        >>> async def app(scope, receive, send):
+        ...     await send({
+        ...         "type": "http.response.start",
+        ...         "status": 200,
+        ...         "headers": [(b"content-type", b"text/html")],
+        ...     })
+        ...     await send_asgi(send, e.table()(rows()))
+    """
+    for c in render_iter(*elements, chunk_size=chunk_size):
+        await send({"type": "http.response.body", "body": c, "more_body": True})
+    await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+@cached("renders")
+def renders(*elements, cache=None):
     """Decorator for rendering dynamic elements based on given template.
 
     It improves the performance a lot by pre-compiling the templates.
     Hence, it's highly recommended to use this decorator.
 
+    The elements are rendered and compiled into a `htmldoom.template.Template`
+    only once, when the function gets decorated. Invalid templates fail here and
+    not on the first render. Extra keys in the returned data are ignored.
+
+    Besides rendering the bytes, the decorated function can also return a lazy
+    `Fragment` using `paras.fragment(...)`, yield the chunks for streaming using
+    `paras.iter(...)` or return a gzip stream using `paras.gzip(...)`, compressing
+    only the slot values (see `htmldoom.compress`). `paras.etag(...)` returns a
+    weak ETag derived from the data, without rendering it (see `htmldoom.etag`).
+
+    To render many rows, e.g. of a table, `rows.rows(dataset)` renders the template
+    once per row of a list of dicts or a dict of columns, escaping each column in
+    bulk. The decorated function is not called in this case.
+
+    With `cache=OutputCache(...)` (or `cache=True` for the defaults), the rendered
+    output gets cached, see `htmldoom.output_cache`. The decorated function gets an
+    `invalidate(*args, **kwargs)` method to invalidate the output for the given
+    arguments.
+
     Example (Python syntax):
         >>> @renders(
         ...     e.p()("{x}"),
@@ -77,47 +157,108 @@ def renders(*elements):
         >>> paras({"x": "awesome paragraph &"})
         b'<p>awesome paragraph &amp;</p><p>another awesome paragraph &amp;</p>'
     """
-    template = render(*elements)
+    template = Template(render(*elements))
 
     def wrapped(func):
+        code = getattr(func, "__code__", None)
+        if code is not None:
+            # The rendered pages depend on the source of the component.
+            record(code.co_filename)
+
+        if cache is not None:
+            return _cached_renderer(func, template, cache)
+
+        @wraps(func)
         def renderer(*args, **kwargs):
-            data = func(*args, **kwargs)
-            for k in data:
-                v = data[k]
-                if (
-                    isinstance(v, str)
-                    or isinstance(v, bytes)
-                    or isinstance(v, Iterator)
-                    or callable(v)
-                ):
-                    data[k] = render(v)
-            return template.format(**data).encode()
+            return template.render(func(*args, **kwargs))
+
+        def fragment(*args, **kwargs):
+            return template.fragment(func(*args, **kwargs))
+
+        def iter_(*args, **kwargs):
+            return render_iter(template.fragment(func(*args, **kwargs)))
+
+        def gzip(*args, **kwargs):
+            from htmldoom.compress import render_gzip
+
+            return render_gzip(template, func(*args, **kwargs))
 
+        def etag(*args, **kwargs):
+            from htmldoom.etag import slots_etag
+
+            return slots_etag(template, func(*args, **kwargs))
+
+        renderer.template = template
+        renderer.fragment = fragment
+        renderer.iter = iter_
+        renderer.gzip = gzip
+        renderer.etag = etag
+        renderer.rows = template.render_rows
         return renderer
 
     return wrapped
 
 
-@lru_cache(maxsize=CacheConfig.MAXSIZE)
+def _cached_renderer(func, template, cache):
+    """Decorate a function like `renders`, caching the rendered output."""
+    if cache is True:
+        from htmldoom.output_cache import OutputCache
+
+        cache = OutputCache()
+    component = cache.register(func, template)
+
+    @wraps(func)
+    def renderer(*args, **kwargs):
+        return cache.render(component, template, func, args, kwargs)
+
+    def fragment(*args, **kwargs):
+        return Fragment((cache.render(component, template, func, args, kwargs),))
+
+    def iter_(*args, **kwargs):
+        return render_iter(cache.render(component, template, func, args, kwargs))
+
+    def gzip(*args, **kwargs):
+        from htmldoom.compress import gzip_bytes
+
+        return gzip_bytes(cache.render(component, template, func, args, kwargs))
+
+    def etag(*args, **kwargs):
+        from htmldoom.etag import slots_etag
+
+        return slots_etag(template, func(*args, **kwargs))
+
+    def invalidate(*args, **kwargs):
+        cache.forget(component, template, func, args, kwargs)
+
+    renderer.template = template
+    renderer.fragment = fragment
+    renderer.iter = iter_
+    renderer.gzip = gzip
+    renderer.etag = etag
+    renderer.rows = template.render_rows
+    renderer.cache = cache
+    renderer.invalidate = invalidate
+    return renderer
+
+
 def double_quote(txt):
     """Double quote strings safely for attributes.
 
     Example:
         >>> double_quote('abc"xyz')
-        '"abc\\"xyz"'
+        '"abc&quot;xyz"'
     """
-    return '"{}"'.format(txt.replace('"', '\\"'))
+    return quote(txt)
 
 
-@lru_cache(maxsize=CacheConfig.MAXSIZE)
 def fmt_prop(key, val):
-    """Format a key-value pair for an HTML tag."""
-    key = key.rstrip("_").replace("_", "-")
+    """Format a key-value pair for an HTML tag.
+
+    To format all the attributes of a tag at once, use `htmldoom.attrs.fmt_props()`.
+    """
     if val is None:
-        if sub("[a-zA-Z_]", "", key):
-            return double_quote(key)
-        return key
-    return f"{key}={double_quote(val)}"
+        return fmt_props((key,))
+    return fmt_props((), {key: val})
 
 
 def loadtxt(path, static=False):
@@ -139,6 +280,7 @@ def loadtxt(path, static=False):
         >>> loadtxt("path/to/file.html", static=True)
         >>> b'&lt;p&gt;{{foo}}&lt;/p&gt;'
     """
+    record(path)
     with open(path) as f:
         data = f.read().strip()
     if static:
@@ -165,6 +307,7 @@ def loadraw(path, static=False):
         >>> loadtxt("path/to/file.html", static=True)
         >>> b'<p>{{foo}}</p>'
     """
+    record(path)
     with open(path) as f:
         data = f.read().strip()
     if static:
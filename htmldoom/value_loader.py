@@ -1,9 +1,28 @@
+"""Load the values of a directory of files into a nested tree of values.
+
+The directories are scanned eagerly, but the files are rendered lazily, when their
+values are accessed for the first time, unless `workers` are given to render all of
+them in advance in a pool of threads. The rendered values are cached until the files
+are modified, so loading the same directory again is cheap. While recording the
+dependencies (see `htmldoom.deps`), the files are checked on every access instead.
+"""
+
+import keyword
 import os
-from collections import namedtuple
+from functools import partial
+from threading import RLock
 from types import MappingProxyType
 
+from htmldoom.deps import is_recording, record
 from htmldoom.util import loadraw, loadtxt, render
-from htmldoom.yaml_loader import loadyaml
+
+
+def _render_yaml(path):
+    # Not to import the YAML loader unless there are YAML files.
+    from htmldoom.yaml_loader import loadyaml
+
+    return render(loadyaml(path))
+
 
 EXTENSION_RENDERERS = MappingProxyType(
     {
@@ -11,24 +30,158 @@ EXTENSION_RENDERERS = MappingProxyType(
         "html": lambda path: render(loadraw(path)),
         "css": lambda path: render(loadraw(path)),
         "js": lambda path: render(loadraw(path)),
-        "yml": lambda path: render(loadyaml(path)),
-        "yaml": lambda path: render(loadyaml(path)),
+        "yml": _render_yaml,
+        "yaml": _render_yaml,
     }
 )
 
+_UNLOADED = object()
+
+# Scanned directories: {path: (stamp, entries)}
+_dirs = {}
+# Rendered files: {(path, renderer): (stamp, value)}
+_files = {}
+# Node types: {fields: type}
+_node_types = {}
+_lock = RLock()
+
+
+class _Node:
+    """A node of the values tree, behaving like a `namedtuple`."""
+
+    __slots__ = ("_loaders", "_values")
+    _fields = ()
 
-def loadvalues(path, extension_renderers=None):
-    """Scan a directory and load the values in a nested namedtuple.
+    def __init__(self, loaders, values):
+        self._loaders = loaders
+        self._values = values
+
+    def _get(self, index):
+        value = self._values[index]
+        if value is _UNLOADED or (is_recording() and self._loaders[index]):
+            # While recording, e.g. building the pages, every access is reported
+            # and the edited files are rendered again.
+            value = self._values[index] = self._loaders[index]()
+        return value
+
+    def _asdict(self):
+        return dict(zip(self._fields, self))
+
+    def __iter__(self):
+        return map(self._get, range(len(self._fields)))
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __getitem__(self, index):
+        return tuple(self)[index]
+
+    def __eq__(self, other):
+        if isinstance(other, (tuple, _Node)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        values = ", ".join(f"{k}={v!r}" for k, v in zip(self._fields, self))
+        return f"{type(self).__name__}({values})"
+
+
+def _node_type(fields):
+    """Create a node type for the given fields, or reuse the one created already."""
+    try:
+        return _node_types[fields]
+    except KeyError:
+        pass
+    for name in fields:
+        if not name.isidentifier() or keyword.iskeyword(name) or name[0] == "_":
+            raise ValueError(f"{name}: Invalid file name, expected a valid identifier.")
+    namespace = {
+        name: property(partial(_Node._get, index=i)) for i, name in enumerate(fields)
+    }
+    namespace.update(__slots__=(), _fields=fields)
+    node_type = _node_types.setdefault(fields, type("Values", (_Node,), namespace))
+    return node_type
+
+
+def _stamp(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_ino, stat.st_size
+
+
+def _scan(path):
+    """List the entries of a directory, only if it has changed since the last scan."""
+    record(path)
+    stamp = _stamp(path)
+    cached = _dirs.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    with os.scandir(path) as it:
+        # Sorted, so that the same directories get the same node types.
+        entries = tuple(sorted((e.name, e.path, e.is_dir()) for e in it))
+    _dirs[path] = (stamp, entries)
+    return entries
+
+
+def _load_file(path, renderer):
+    """Render a file, only if it has changed since it was last rendered."""
+    record(path)
+    key = (path, renderer)
+    stamp = _stamp(path)
+    cached = _files.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    value = renderer(path)
+    with _lock:
+        _files[key] = (stamp, value)
+    return value
+
+
+def _load(path, extension_renderers, pending):
+    nodes = {}
+    for node, _path, is_dir in _scan(path):
+        if is_dir:
+            nodes[node] = (None, _load(_path, extension_renderers, pending))
+            continue
+
+        if node.count(".") != 1:
+            raise NameError(f"{_path}: Invalid filename.")
+
+        r_extension, r_filename = node[::-1].split(".", 1)
+        filename, extension = r_filename[::-1], r_extension[::-1]
+
+        if extension not in extension_renderers:
+            raise TypeError(f"{_path}: No render found for this file type.")
+
+        if filename in nodes:
+            raise NameError(f"{_path}: Duplicate file name: {filename}.")
+
+        loader = partial(_load_file, _path, extension_renderers[extension])
+        nodes[filename] = (loader, _UNLOADED)
+
+    loaders = tuple(loader for loader, _ in nodes.values())
+    values = [value for _, value in nodes.values()]
+    tree = _node_type(tuple(nodes))(loaders, values)
+    pending.extend((tree, i) for i, v in enumerate(values) if v is _UNLOADED)
+    return tree
+
+
+def loadvalues(path, extension_renderers=None, workers=None):
+    """Scan a directory and load the values in a nested namedtuple-like tree.
 
     Arguments:
         path: Path to the directory of files containing values.
         extension_renderers: A map of file extensions and their renderers.
+        workers (int): Render all the files in advance in a pool of threads.
+            By default, each file gets rendered when its value is first accessed.
 
     Example:
         >>> from htmldoom.value_loader import loadvalues
-        >>> 
+        >>>
         >>> values = loadvalues("path/to/values")
-        >>> 
+        >>>
         >>> values.foo
         'bar'
     """
@@ -36,25 +189,21 @@ def loadvalues(path, extension_renderers=None):
     if extension_renderers is None:
         extension_renderers = EXTENSION_RENDERERS
 
-    nodes = {}
-    for node in os.listdir(path):
-        _path = os.path.join(path, node)
-        if os.path.isdir(_path):
-            filename, value = node, loadvalues(_path)
-        else:
-            if node.count(".") != 1:
-                raise NameError(f"{_path}: Invalid filename.")
+    pending = []
+    tree = _load(os.fspath(path), extension_renderers, pending)
+    if workers and pending:
+        from concurrent.futures import ThreadPoolExecutor
 
-            r_extension, r_filename = node[::-1].split(".", 1)
-            filename, extension = r_filename[::-1], r_extension[::-1]
+        with ThreadPoolExecutor(workers) as pool:
+            for _ in pool.map(lambda p: p[0]._get(p[1]), pending):
+                pass
+    return tree
 
-            if extension not in extension_renderers:
-                raise TypeError(f"{_path}: No render found for this file type.")
 
-            if filename in nodes:
-                raise NameError(f"{_path}: Duplicate file name: {filename}.")
+def _cache_clear():
+    with _lock:
+        _dirs.clear()
+        _files.clear()
 
-            value = extension_renderers[extension](_path)
 
-        nodes[filename] = value
-    return namedtuple("Values", nodes.keys())(**nodes)
+loadvalues.cache_clear = _cache_clear
@@ -2,15 +2,49 @@
 
 Find the examples YAML formats in: tests/assets/yaml_components/valid.yml
 Or the `VALID_FORMAT` variable in this module.
-"""
 
-from functools import lru_cache
+Each YAML file is parsed only once, no matter how many directives are loaded from
+it. The directives are rendered lazily, when they are loaded for the first time.
+The edited files are parsed again, unless `YamlConfig.HOT_RELOAD` is disabled.
+
+With `YamlConfig.DISK_CACHE` enabled, the rendered directives are also stored in a
+`.htmldoomc` file next to the YAML file, along with the hash of its content. Other
+processes load the directives from there, without parsing the YAML at all. The files
+are written in batches by `flush()`, at exit or when the cache is cleared, merging
+the directives written by the other processes meanwhile.
+
+PyYAML is imported only when a file has to be parsed.
+"""
 
-from yaml import SafeLoader, dump, load
+import atexit
+import marshal
+import os
+from threading import RLock
 
 from htmldoom import render
 from htmldoom.base import composite_tag, leaf_tag, txt
-from htmldoom.conf import CacheConfig
+from htmldoom.cache import cache_manager
+from htmldoom.conf import YamlConfig
+from htmldoom.deps import record
+
+
+def load(stream):
+    """Parse YAML safely, using libyaml if available."""
+    import yaml
+
+    try:
+        loader = yaml.CSafeLoader
+    except AttributeError:  # pragma: no cover
+        # PyYAML without libyaml.
+        loader = yaml.SafeLoader
+    return yaml.load(stream, Loader=loader)
+
+
+def dump(data, **kwargs):
+    from yaml import dump
+
+    return dump(data, **kwargs)
+
 
 VALID_FORMAT = """
 * Leaf tag: <tagname />
@@ -105,7 +139,7 @@ def parse(data):
         ...         ],
         ...     ]
         ... })
-        b'<div class="row">This is an element. <i>*</i></div>'
+        Fragment(b'<div class="row">This is an element. <i>*</i></div>')
     """
 
     if isinstance(data, dict):
@@ -159,7 +193,129 @@ def parse(data):
     return render(data).encode()
 
 
-@lru_cache(maxsize=CacheConfig.MAXSIZE)
+# Bump it when the format of the `.htmldoomc` files changes.
+_COMPILED_VERSION = 1
+
+_UNPARSED = object()
+
+# Loaded documents: {path: _Document}
+_documents = {}
+# The documents with directives rendered since the last flush.
+_dirty = set()
+_lock = RLock()
+
+
+def _stamp(path):
+    """Identify the version of a file, to notice when it gets edited or replaced."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_ino, stat.st_size
+
+
+def _compiled_path(path):
+    return os.path.splitext(path)[0] + ".htmldoomc"
+
+
+def _read_compiled(path, digest):
+    """Read the rendered directives of a YAML file with the given content hash."""
+    try:
+        with open(_compiled_path(path), "rb") as f:
+            version, compiled_digest, compiled = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return {}
+    if version != _COMPILED_VERSION or compiled_digest != digest:
+        return {}
+    return compiled
+
+
+def _write_compiled(path, digest, compiled):
+    """Atomically replace the `.htmldoomc` file of a YAML file."""
+    target = _compiled_path(path)
+    try:
+        from tempfile import mkstemp
+
+        data = marshal.dumps((_COMPILED_VERSION, digest, compiled))
+        fd, tmp = mkstemp(prefix=".htmldoomc-", dir=os.path.dirname(target) or ".")
+    except (OSError, ValueError):
+        # Read-only directory or a directive that can't be marshalled, it's only
+        # a cache after all.
+        return
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, target)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+class _Document:
+    """A YAML file, parsed only when one of its directives has to be rendered."""
+
+    def __init__(self, path, stamp):
+        self.path = path
+        self.stamp = stamp
+        with open(path, "rb") as f:
+            self.source = f.read()
+        self._elements = _UNPARSED
+        self.digest = None
+        self.compiled = {}
+        if YamlConfig.DISK_CACHE:
+            from hashlib import sha256
+
+            self.digest = sha256(self.source).hexdigest()
+            self.compiled = _read_compiled(path, self.digest)
+
+    @property
+    def elements(self):
+        if self._elements is _UNPARSED:
+            self._elements = load(self.source)
+            self.source = None
+        return self._elements
+
+    def render(self, directive, static):
+        key = (directive, static)
+        try:
+            return self.compiled[key]
+        except KeyError:
+            pass
+
+        elements = self.elements
+        for node in directive:
+            elements = elements[node]
+
+        if elements is None:
+            raise ValueError(
+                f"Invalid format here: {self.path} Valid format is:\n{VALID_FORMAT}"
+            )
+
+        # Loaded components live long in the cache, keep them compact.
+        data = bytes(parse(elements))
+        if static:
+            data = data.decode().replace("{", "{{").replace("}", "}}").encode()
+
+        if self.digest is not None:
+            with _lock:
+                self.compiled[key] = data
+                _dirty.add(self)
+        return data
+
+
+def _document(path):
+    """Get the loaded document, loading the file again only if it has changed."""
+    doc = _documents.get(path)
+    if doc is not None and (not YamlConfig.HOT_RELOAD or _stamp(path) == doc.stamp):
+        return doc
+
+    with _lock:
+        stamp = _stamp(path)
+        doc = _documents.get(path)
+        if doc is None or doc.stamp != stamp:
+            doc = _documents[path] = _Document(path, stamp)
+        return doc
+
+
 def loadyaml(path, directive=None, static=False):
     """Loads given YAML file/directive into HTML
 
@@ -188,22 +344,47 @@ def loadyaml(path, directive=None, static=False):
         >>> loadyaml("/path/to/components.yml", ("paragraph", "case", True))
         b'<p>{foo}</p>'
     """
-    with open(path) as f:
-        elements = load(f, Loader=SafeLoader)
-
+    path = os.fspath(path)
     if isinstance(directive, str):
         directive = directive.split(".")
+    directive = tuple(directive) if directive else ()
+    record(path, directive, static)
+
+    doc = _document(path)
+    key = ("loadyaml", (path, directive, static), doc.stamp)
+    data = cache_manager.get(key)
+    if data is None:
+        data = doc.render(directive, static)
+        cache_manager.set(key, data)
+    return data
 
-    if directive:
-        for node in directive:
-            elements = elements[node]
 
-    if elements is None:
-        raise ValueError(
-            f"Invalid format here: {path} Valid format is:\n{VALID_FORMAT}"
-        )
+def flush():
+    """Write the newly rendered directives into the `.htmldoomc` files.
 
-    data = parse(elements)
-    if static:
-        data = data.decode().replace("{", "{{").replace("}", "}}").encode()
-    return data
+    The directives written by the other processes meanwhile are kept. The files
+    edited since they were loaded are skipped.
+    """
+    with _lock:
+        for doc in _dirty:
+            try:
+                if _stamp(doc.path) != doc.stamp:
+                    continue
+            except OSError:
+                continue
+            compiled = _read_compiled(doc.path, doc.digest)
+            compiled.update(doc.compiled)
+            _write_compiled(doc.path, doc.digest, compiled)
+        _dirty.clear()
+
+
+def _cache_clear():
+    with _lock:
+        flush()
+        _documents.clear()
+    cache_manager.clear("loadyaml")
+
+
+atexit.register(flush)
+cache_manager.names.add("loadyaml")
+loadyaml.cache_clear = _cache_clear
@@ -0,0 +1,135 @@
+import asyncio
+import time
+
+import pytest
+
+from htmldoom import elements as e
+from htmldoom import render
+from htmldoom.aio import async_render, async_render_iter, async_renders
+from htmldoom.base import raw
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+async def later(value, delay=0.01):
+    await asyncio.sleep(delay)
+    return value
+
+
+async def agen(*values):
+    for value in values:
+        await asyncio.sleep(0)
+        yield value
+
+
+async def collect(aiterable):
+    return [x async for x in aiterable]
+
+
+def test_async_render():
+    assert run(async_render(later("<"), later(raw("<")))) == "&lt;<"
+    assert run(async_render(e.p()(later(e.i()(later("x")))))) == "<p><i>x</i></p>"
+    assert (
+        run(async_render(e.ul()(agen(e.li()("a"), later(e.li()("b"))))))
+        == "<ul><li>a</li><li>b</li></ul>"
+    )
+    assert (
+        run(async_render(e.ul()(e.li()(later(str(i))) for i in range(3))))
+        == "<ul><li>0</li><li>1</li><li>2</li></ul>"
+    )
+    assert run(async_render(e.p()("x"))) == render(e.p()("x"))
+
+
+def test_async_render_concurrently():
+    start = time.monotonic()
+    result = run(async_render(*(e.p()(later(str(i), 0.1)) for i in range(10))))
+    assert time.monotonic() - start < 0.5
+    assert result == "".join(f"<p>{i}</p>" for i in range(10))
+
+
+def test_async_render_iter():
+    async def stream():
+        chunks = async_render_iter(e.p()("x"), e.p()(later("y", 0.1)))
+        start = time.monotonic()
+        first = await chunks.__anext__()
+        elapsed = time.monotonic() - start
+        return first, elapsed, b"".join(await collect(chunks))
+
+    first, elapsed, rest = run(stream())
+    assert first == b"<p>x</p><p>"
+    assert elapsed < 0.1
+    assert rest == b"y</p>"
+
+
+def test_async_render_iter_lazy():
+    consumed = []
+
+    def rows():
+        for i in range(1000):
+            consumed.append(i)
+            yield e.tr()(e.td()(later(str(i), 0)))
+
+    async def stream():
+        chunks = async_render_iter(e.table()(rows()), chunk_size=0)
+        first = await chunks.__anext__()
+        return first, len(consumed), b"".join(await collect(chunks))
+
+    first, nconsumed, rest = run(stream())
+    assert first.startswith(b"<table>")
+    assert nconsumed <= 1
+    assert rest.endswith(b"<tr><td>999</td></tr></table>")
+
+
+def test_async_render_error():
+    async def fail():
+        raise KeyError("x")
+
+    with pytest.raises(KeyError):
+        run(async_render(e.p()(fail())))
+
+    with pytest.raises(ValueError):
+        render(e.p()(agen("x")))
+
+
+def test_async_renders():
+    @async_renders(e.p()("{x}"), e.ul()("{items}"))
+    async def component(x):
+        return {"x": later(x), "items": agen(e.li()("a"), e.li()("b"))}
+
+    expected = b"<p>&lt;</p><ul><li>a</li><li>b</li></ul>"
+    assert run(component("<")) == expected
+    assert b"".join(run(collect(component.iter("<")))) == expected
+
+    @async_renders(e.p()("{x}"))
+    def sync_component(x):
+        return {"x": x}
+
+    assert run(sync_component(raw("<"))) == b"<p><</p>"
+
+
+def test_async_renders_repeated():
+    calls = []
+
+    async def value():
+        calls.append(1)
+        return "<"
+
+    @async_renders(e.p()("{x}"), e.p()("{x}{y:2d}"))
+    async def component():
+        return {"x": value(), "y": later(1)}
+
+    assert run(component()) == b"<p>&lt;</p><p>&lt; 1</p>"
+    assert b"".join(run(collect(component.iter()))) == b"<p>&lt;</p><p>&lt; 1</p>"
+    assert calls == [1, 1]
+
+    @async_renders(e.p()("{x}"), e.p()("{x}"))
+    def generated():
+        return {"x": agen("a", later("b"))}
+
+    assert run(generated()) == b"<p>ab</p><p>ab</p>"
@@ -0,0 +1,91 @@
+from html import escape
+
+from htmldoom import elements as e
+from htmldoom import render
+from htmldoom.attrs import (
+    attr_name,
+    escape_attr,
+    escape_attrs,
+    fmt_normalized,
+    fmt_props,
+    normalize_props,
+    quote,
+)
+from htmldoom.util import double_quote, fmt_prop
+
+
+def test_attr_name():
+    assert attr_name("class_") == "class"
+    assert attr_name("data_row_id") == "data-row-id"
+    assert attr_name("http-equiv") == "http-equiv"
+
+
+def test_fmt_props():
+    assert fmt_props() == ""
+    assert fmt_props(("hidden", "a b", "data_x")) == 'hidden "a b" "data-x"'
+    assert fmt_props((), {"class_": "x", "id_": "y"}) == 'class="x" id="y"'
+    assert fmt_props(("hidden",), {"for_": "x"}) == 'hidden for="x"'
+
+
+def test_fmt_prop():
+    assert fmt_prop("hidden", None) == "hidden"
+    assert fmt_prop("a b", None) == '"a b"'
+    assert fmt_prop("class_", "x") == 'class="x"'
+    for key, val in (("hidden", None), ("class_", "x"), ("a_b", None)):
+        expected = fmt_props((key,)) if val is None else fmt_props((), {key: val})
+        assert fmt_prop(key, val) == expected
+
+
+def test_escape_attr():
+    value = "nothing to escape"
+    assert escape_attr(value) is value
+    assert escape_attr('<a href="?x=1&y=2">') == escape(
+        '<a href="?x=1&y=2">', quote=True
+    )
+    assert escape_attr("it's") == "it's"
+
+
+def test_escape_attrs():
+    values = ["a", "b"]
+    assert escape_attrs(values) == values
+    assert escape_attrs(["a&b", '"', "c"]) == ["a&amp;b", "&quot;", "c"]
+    assert escape_attrs(["a\0b", "<"]) == ["a\0b", "&lt;"]
+    assert escape_attrs([]) == []
+
+
+def test_quote():
+    assert quote("x") == '"x"'
+    assert quote('x" onclick="alert(1)') == '"x&quot; onclick=&quot;alert(1)"'
+    assert double_quote('abc"xyz') == '"abc&quot;xyz"'
+    assert (
+        render(e.a(href="/?a=1&b=2", title='"x"')("y"))
+        == '<a href="/?a=1&amp;b=2" title="&quot;x&quot;">y</a>'
+    )
+
+
+def test_normalize_props():
+    assert normalize_props() == ()
+    assert normalize_props(("hidden", "hidden"), {"hidden": "x", "id_": "a"}) == (
+        ("hidden", "x"),
+        ("id", "a"),
+    )
+    assert normalize_props((), {"id": "a", "class_": "b"}, sort=True) == (
+        normalize_props((), {"class_": "b", "id_": "a"}, sort=True)
+    )
+    assert fmt_normalized(normalize_props(("a b", "data_x"), {"class_": '"'})) == (
+        fmt_props(("a b", "data_x"), {"class_": '"'})
+    )
+
+
+def test_canonical_attrs(monkeypatch):
+    from htmldoom.base import composite_tag
+    from htmldoom.conf import RenderConfig
+
+    div = composite_tag("div")
+    assert div(id="a", class_="b")() == b'<div id="a" class="b"></div>'
+    assert div("id", id_="a")() == b'<div id="a"></div>'
+
+    monkeypatch.setattr(RenderConfig, "CANONICAL_ATTRS", True)
+    assert div(id="a", class_="b") is div(class_="b", id_="a")
+    assert div(id="a", class_="b")() == b'<div class="b" id="a"></div>'
+    div.cache_clear()
@@ -22,3 +22,23 @@ def test_leaf_tag():
         render(leaf_tag("a")(leaf_tag("b")()))
     with pytest.raises(ValueError):
         render(composite_tag("a")(composite_tag("b")()))
+
+
+def test_tag_shapes():
+    div, br = composite_tag("div"), leaf_tag("br")
+    assert div()() == b"<div></div>"
+    assert div()(b"<i></i>") == b"<div><i></i></div>"
+    assert div()("<") == b"<div>&lt;</div>"
+    assert div()(div()("x")) == b"<div><div>x</div></div>"
+    assert div()("a", b"b", div()()) == b"<div>ab<div></div></div>"
+    assert div(class_='"x"')("y") == b'<div class="&quot;x&quot;">y</div>'
+    assert div(class_="x")() is div(class_="x")()
+    assert div(id="x")() == b'<div id="x"></div>'
+    assert div("hidden", class_="x")() == b'<div hidden class="x"></div>'
+    assert br() == b"<br />"
+    assert br(class_="<x>") == b'<br class="&lt;x&gt;" />'
+    assert br(class_="x", id="y") == b'<br class="x" id="y" />'
+    assert div(id="x") is div(id="x")
+    assert repr(div(id="x")) == """Element(b'<div id="x">', b'</div>')"""
+    div.cache_clear()
+    br.cache_clear()
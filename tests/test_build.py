@@ -0,0 +1,156 @@
+import os
+from functools import partial
+
+import pytest
+
+from htmldoom import build as build_module
+from htmldoom import deps
+from htmldoom import elements as e
+from htmldoom.build import MANIFEST, build, watch
+from htmldoom.deps import recording
+from htmldoom.util import loadtxt, renders
+from htmldoom.value_loader import loadvalues
+from htmldoom.yaml_loader import loadyaml
+
+
+def page(src, name):
+    return e.html()(
+        e.body()(
+            loadyaml(os.path.join(src, "components.yml"), name),
+            e.p()(loadvalues(os.path.join(src, "values")).title),
+        )
+    )
+
+
+@pytest.fixture
+def site(tmp_path):
+    src = tmp_path / "src"
+    (src / "values").mkdir(parents=True)
+    (src / "components.yml").write_text(
+        "index: {h1: [[Index]]}\nabout: {h1: [[About]]}\n"
+    )
+    (src / "values" / "title.txt").write_text("Title")
+    pages = {f"{n}.html": partial(page, str(src), n) for n in ("index", "about")}
+    return src, pages, tmp_path / "dist"
+
+
+def test_recording(site):
+    src, pages, _ = site
+    with recording() as files:
+        pages["index.html"]()
+    assert (os.path.join(str(src), "components.yml"), ("index",), False) in files
+    assert os.path.join(str(src), "values", "title.txt") in files
+
+
+def test_build(site):
+    src, pages, dist = site
+    assert build(pages, str(dist)) == ["index.html", "about.html"]
+    assert (dist / "index.html").read_text() == (
+        "<html><body><h1>Index</h1><p>Title</p></body></html>"
+    )
+    assert (dist / MANIFEST).exists()
+    assert build(pages, str(dist)) == []
+
+    # Touched, but not changed
+    os.utime(str(src / "components.yml"), ns=(1, 1))
+    assert build(pages, str(dist)) == []
+
+    (src / "values" / "title.txt").write_text("New title")
+    assert build(pages, str(dist)) == ["index.html", "about.html"]
+    assert "New title" in (dist / "about.html").read_text()
+
+    # Output deleted
+    (dist / "about.html").unlink()
+    assert build(pages, str(dist)) == ["about.html"]
+    assert (dist / "about.html").exists()
+
+
+def test_build_only_changed_outputs_are_written(site):
+    src, pages, dist = site
+    build(pages, str(dist))
+    os.utime(str(dist / "index.html"), ns=(1, 1))
+    stamp = os.stat(str(dist / "index.html")).st_mtime_ns
+
+    (src / "values" / "title.txt").write_text("Title\n")
+    assert build(pages, str(dist)) == ["index.html", "about.html"]
+    assert os.stat(str(dist / "index.html")).st_mtime_ns == stamp
+
+
+def test_build_per_directive(site):
+    src, pages, dist = site
+    build(pages, str(dist))
+
+    (src / "components.yml").write_text("index: {h1: [[Index]]}\nabout: {h1: [[Us]]}\n")
+    assert build(pages, str(dist)) == ["about.html"]
+    assert "Us" in (dist / "about.html").read_text()
+
+    # Edited, but rendered the same
+    (src / "components.yml").write_text(
+        "index:\n  h1: [[Index]]\nabout: {h1: [[Us]]}\n"
+    )
+    assert build(pages, str(dist)) == []
+
+    (src / "components.yml").write_text("about: {h1: [[Us]]}\n")
+    with pytest.raises(KeyError):
+        build(pages, str(dist))
+
+
+def test_build_shared_values(site):
+    src, _, dist = site
+    values = loadvalues(str(src / "values"))
+    pages = {f"{n}.html": partial(lambda n: e.p()(n, values.title), n) for n in "ab"}
+    assert build(pages, str(dist)) == ["a.html", "b.html"]
+
+    (src / "values" / "title.txt").write_text("New title")
+    assert build(pages, str(dist)) == ["a.html", "b.html"]
+    assert "New title" in (dist / "b.html").read_text()
+
+
+def test_build_shared_directive(monkeypatch, tmp_path):
+    monkeypatch.setattr(deps, "shared", set())
+    monkeypatch.setattr(build_module, "_shared", {})
+    path, dist = tmp_path / "c.yml", str(tmp_path / "dist")
+    path.write_text("x: {h1: [[hi]]}\n")
+
+    def components():
+        # Loaded at import time, outside of the recordings
+        @renders(loadyaml(str(path), "x"))
+        def index():
+            return {}
+
+        return {"index.html": index}
+
+    pages = components()
+    assert build(pages, dist) == ["index.html"]
+
+    path.write_text("x: {h2: [[hi]]}\n")
+    assert watch(pages, dist, interval=0) == str(path)
+    # Rendered with the stale template, but not recorded as up to date
+    build(pages, dist)
+
+    # The next process
+    monkeypatch.setattr(build_module, "_shared", {})
+    loadyaml.cache_clear()
+    assert build(components(), dist) == ["index.html"]
+    assert (tmp_path / "dist" / "index.html").read_text() == "<h2>hi</h2>"
+
+
+def test_watch(site, tmp_path):
+    src, pages, dist = site
+    source = tmp_path / "source.py"
+    source.write_text("")
+    pages["raw.html"] = partial(loadtxt, str(source))
+    builds = []
+
+    def on_build(rendered):
+        builds.append(rendered)
+        if len(builds) == 1:
+            (src / "values" / "title.txt").write_text("Changed")
+        else:
+            source.write_text("# changed")
+
+    assert watch(pages, str(dist), interval=0, on_build=on_build) == str(source)
+    assert builds == [
+        ["index.html", "about.html", "raw.html"],
+        ["index.html", "about.html"],
+    ]
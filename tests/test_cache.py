@@ -0,0 +1,118 @@
+from htmldoom.base import Element, txt
+from htmldoom.cache import LFU, LRU, TTL, CacheManager, _sizeof, cache_manager, cached
+from htmldoom.elements import div
+
+
+def test_lru():
+    manager = CacheManager(maxbytes=1000, maxsize=2, policy=LRU())
+    manager.set("a", 1)
+    manager.set("b", 2)
+    assert manager.get("a") == 1
+    manager.set("c", 3)
+    assert manager.get("b") is None
+    assert manager.get("a") == 1
+    assert manager.get("c") == 3
+
+
+def test_lfu():
+    manager = CacheManager(maxbytes=1000, maxsize=2, policy=LFU())
+    manager.set("a", 1)
+    manager.set("b", 2)
+    manager.get("a")
+    manager.get("a")
+    manager.get("b")
+    manager.set("c", 3)
+    assert manager.get("b") is None
+    assert manager.get("a") == 1
+    assert manager.get("c") == 3
+
+
+def test_ttl():
+    manager = CacheManager(maxbytes=1000, maxsize=10, policy=TTL(-1))
+    manager.set("a", 1)
+    assert manager.get("a") is None
+    assert len(manager) == 0 and manager.nbytes == 0
+
+    manager.set_policy(TTL(60))
+    manager.set("a", 1)
+    assert manager.get("a") == 1
+
+
+def test_maxbytes():
+    manager = CacheManager(maxbytes=10, maxsize=100, policy=LRU())
+    manager.set("a", b"xxxx")
+    manager.set("b", b"xxxx")
+    assert manager.nbytes == 10
+    manager.set("c", b"xxxx")
+    assert manager.get("a") is None
+    assert manager.nbytes == 10
+
+    # Too big to be cached at all
+    manager.set("d", b"x" * 100)
+    assert manager.get("d") is None
+    assert manager.get("b") == b"xxxx"
+
+    manager.resize(maxbytes=5)
+    assert len(manager) == 1
+    assert manager.get("b") == b"xxxx"
+
+
+def test_max_entry_bytes():
+    manager = CacheManager(maxbytes=100, maxsize=100, policy=LRU(), max_entry_bytes=5)
+    manager.set("a", b"xxxx")
+    manager.set("b", b"xxxxx")
+    assert manager.get("a") == b"xxxx"
+    assert manager.get("b") is None
+
+
+def test_cached():
+    manager = CacheManager(maxbytes=1000, maxsize=100, policy=LRU())
+    calls = []
+
+    @cached("double", manager=manager)
+    def double(x):
+        calls.append(x)
+        return x * 2
+
+    @cached("triple", manager=manager)
+    def triple(x):
+        calls.append(x)
+        return x * 3
+
+    assert double(2) == 4
+    assert double(2) == 4
+    assert triple(2) == 6
+    assert calls == [2, 2]
+
+    double.cache_clear()
+    assert len(manager) == 1
+    assert double(2) == 4
+    assert calls == [2, 2, 2]
+
+    manager.clear()
+    assert len(manager) == 0
+
+
+def test_shared_cache():
+    cache_manager.clear()
+    txt("<p>shared</p>")
+    assert len(cache_manager) == 1
+    cache_manager.clear("txt")
+    assert len(cache_manager) == 0
+
+
+def test_memos_cleared():
+    div(class_="memo")
+    memo = cache_manager.memos["composite_tag:div"]
+    assert "memo" in memo
+    cache_manager.clear("composite_tag:div")
+    assert "memo" not in memo
+
+    div(class_="memo")
+    cache_manager.clear()
+    assert "memo" not in memo
+
+
+def test_element_size():
+    opening = b'<div id="%s">' % (b"x" * 5000)
+    assert _sizeof(Element(opening, b"</div>")) > len(opening)
@@ -0,0 +1,58 @@
+from importlib.util import module_from_spec, spec_from_file_location
+
+from htmldoom import renders
+from htmldoom.compile import main
+from htmldoom.value_loader import loadvalues
+from htmldoom.yaml_loader import loadyaml as ly
+
+YAML_COMPONENTS = "tests/assets/yaml_components/valid.yml"
+YAML_TEMPLATES = """
+page:
+  title: {h1: [[ "{title}" ]]}
+  body:
+  - p: [{class: x}, [ "{v[y]:4} & {title}" ]]
+  - "{{literal}}"
+nested: {p: [[ "{w:{n}}" ]]}
+"""
+
+
+def compiled(source, tmp_path):
+    output = tmp_path / "compiled.py"
+    main([str(source), "-o", str(output)])
+    spec = spec_from_file_location("compiled", str(output))
+    module = module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_compile_yaml(tmp_path):
+    module = compiled(YAML_COMPONENTS, tmp_path)
+    assert ("leaf_tag", "empty") in module.COMPONENTS
+    assert ("switch", "case", True) in module.COMPONENTS
+    for directive, data in module.COMPONENTS.items():
+        assert data == ly(YAML_COMPONENTS, directive)
+        assert module.load(directive, static=True) == ly(
+            YAML_COMPONENTS, directive, static=True
+        )
+    assert module.load("somevalue.foo") == ly(YAML_COMPONENTS, "somevalue.foo")
+
+    module = compiled("tests/assets/yaml_components/red_alert.yml", tmp_path)
+    assert module.load() == ly("tests/assets/yaml_components/red_alert.yml")
+
+
+def test_compile_yaml_templates(tmp_path):
+    path = tmp_path / "templates.yml"
+    path.write_text(YAML_TEMPLATES)
+    module = compiled(path, tmp_path)
+
+    data = {"title": "<t>", "v": {"y": "a"}, "w": 1, "n": 3}
+    for directive in (("page", "title"), ("page", "body"), ("nested",)):
+        expected = renders(ly(path, directive))(lambda: data)()
+        assert module.RENDERERS[directive](data) == expected
+        assert bytes(module.FRAGMENTS[directive](data)) == expected
+
+
+def test_compile_values(tmp_path):
+    module = compiled("tests/assets/values/valid", tmp_path)
+    assert module.VALUES == loadvalues("tests/assets/values/valid")
+    assert module.VALUES.c.d == '<p class="x">x</p>'
@@ -0,0 +1,62 @@
+import gzip
+import zlib
+
+import pytest
+
+from htmldoom import elements as e
+from htmldoom import render, renders
+from htmldoom.compress import render_compressed, render_gzip
+from htmldoom.template import Template
+
+
+def test_render_compressed():
+    def page():
+        return e.div()(e.p()("x" * 1000), (e.p()(str(i)) for i in range(100)))
+
+    expected = render(page()).encode()
+    chunks = list(render_compressed(page(), chunk_size=100))
+    assert len(chunks) > 2
+    assert gzip.decompress(b"".join(chunks)) == expected
+
+    # Every chunk can be decompressed as soon as it's received.
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    first = decompressor.decompress(chunks[0])
+    assert len(first) >= 100 and expected.startswith(first)
+
+    with pytest.raises(ValueError):
+        list(render_compressed(page(), encoding="zstd"))
+
+
+def test_render_compressed_brotli():
+    brotli = pytest.importorskip("brotli")
+    chunks = render_compressed(e.p()("x" * 1000), encoding="br")
+    assert brotli.decompress(b"".join(chunks)) == b"<p>" + b"x" * 1000 + b"</p>"
+
+
+def test_render_gzip():
+    template = Template("<html><title>{t}</title>" + "<p>static</p>" * 100 + "{x}{y}")
+    for data in (
+        {"t": "<&>", "x": b"<b>", "y": ""},
+        {"t": "", "x": "y" * 100000, "y": e.i()("z")},
+    ):
+        compressed = render_gzip(template, data)
+        assert gzip.decompress(compressed) == template.render(data)
+
+    formatted = Template("<p>{x.real:4}</p>")
+    assert gzip.decompress(render_gzip(formatted, {"x": 1})) == b"<p>   1</p>"
+
+    with pytest.raises(KeyError):
+        render_gzip(template, {})
+
+
+def test_renders_gzip():
+    @renders(e.p()("{x}"))
+    def para(x):
+        return {"x": x}
+
+    @renders(e.p()("{x}"), cache=True)
+    def cached(x):
+        return {"x": x}
+
+    assert gzip.decompress(para.gzip("&")) == b"<p>&amp;</p>"
+    assert gzip.decompress(cached.gzip("&")) == b"<p>&amp;</p>"
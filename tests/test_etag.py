@@ -0,0 +1,64 @@
+import pytest
+
+from htmldoom import elements as e
+from htmldoom import render, renders
+from htmldoom.etag import ETagIter, matches, render_etag, slots_etag
+from htmldoom.template import Template
+from htmldoom.util import render_iter
+
+
+def test_render_etag():
+    def page():
+        return e.ul()((e.li()(str(i)) for i in range(1000)))
+
+    body, etag = render_etag(page())
+    assert body == render(page()).encode()
+    assert etag.startswith('"') and etag == render_etag(body)[1]
+    assert etag != render_etag(e.ul()())[1]
+
+    chunks = ETagIter(render_iter(page(), chunk_size=100))
+    assert chunks.etag is None
+    assert b"".join(chunks) == body
+    assert chunks.etag == etag
+
+
+def test_slots_etag():
+    template = Template("<p>{x}{y}</p>")
+    etag = slots_etag(template, {"x": "a", "y": 1})
+    assert etag.startswith('W/"')
+    assert etag == slots_etag(Template("<p>{x}{y}</p>"), {"x": "a", "y": 1})
+    assert etag != slots_etag(template, {"x": "a", "y": "1"})
+    assert etag != slots_etag(template, {"x": "a1", "y": ""})
+    assert etag != slots_etag(Template("<b>{x}{y}</b>"), {"x": "a", "y": 1})
+    assert slots_etag(template, {"x": e.i()("a"), "y": ()}) == slots_etag(
+        template, {"x": b"<i>a</i>", "y": ()}
+    )
+    assert slots_etag(template, {"x": "a", "y": ()}) != slots_etag(
+        template, {"x": "a", "y": []}
+    )
+    assert slots_etag(template, {"x": iter("a"), "y": 1}) is None
+    assert slots_etag(template, {"x": object(), "y": 1}) is None
+    with pytest.raises(KeyError):
+        slots_etag(template, {"x": "a"})
+
+
+def test_renders_etag():
+    calls = []
+
+    @renders(e.p()("{x}"))
+    def para(x):
+        calls.append(x)
+        return {"x": x}
+
+    assert para.etag("a") == para.etag("a") != para.etag("b")
+    assert para.etag("a") == slots_etag(para.template, {"x": "a"})
+
+
+def test_matches():
+    assert matches('"a"', '"a"')
+    assert matches('W/"a", "b"', '"a"')
+    assert matches('"b", "a"', 'W/"a"')
+    assert matches("*", '"a"')
+    assert not matches('"b"', '"a"')
+    assert not matches(None, '"a"')
+    assert not matches('"a"', None)
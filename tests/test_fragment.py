@@ -0,0 +1,40 @@
+import pytest
+
+from htmldoom import elements as e
+from htmldoom import render
+from htmldoom.base import raw, txt
+from htmldoom.fragment import Fragment, chunk, fragment
+
+
+def test_fragment():
+    frag = e.div()(e.p()("<x>"), raw("<br />"))
+    assert isinstance(frag, Fragment)
+    assert bytes(frag) == b"<div><p>&lt;x&gt;</p><br /></div>"
+    assert frag == b"<div><p>&lt;x&gt;</p><br /></div>"
+    assert b"<div><p>&lt;x&gt;</p><br /></div>" == frag
+    assert frag == fragment(raw("<div><p>&lt;x&gt;</p><br /></div>"))
+    assert hash(frag) == hash(b"<div><p>&lt;x&gt;</p><br /></div>")
+    assert frag.decode() == "<div><p>&lt;x&gt;</p><br /></div>"
+    assert frag != "<div><p>&lt;x&gt;</p><br /></div>"
+
+
+def test_fragment_add():
+    assert e.p()("a") + e.p()("b") == b"<p>a</p><p>b</p>"
+    assert b"<hr />" + e.p()("a") == b"<hr /><p>a</p>"
+    assert e.p()("a") + b"<hr />" == b"<p>a</p><hr />"
+
+
+def test_chunk():
+    assert chunk("<") == txt("<")
+    assert chunk(b"<") == b"<"
+    assert chunk(e.hr) == b"<hr />"
+    assert chunk(iter(["<", b"<"])) == b"&lt;<"
+    with pytest.raises(ValueError):
+        chunk(1)
+
+
+def test_deep_nesting():
+    el = "x"
+    for _ in range(10000):
+        el = e.div()(el)
+    assert render(el) == "<div>" * 10000 + "x" + "</div>" * 10000
@@ -0,0 +1,54 @@
+import subprocess
+import sys
+
+import pytest
+
+# Cumulative microseconds to import htmldoom and the common modules. Generous, to
+# not fail on slow machines, but low enough to catch the heavy imports.
+BUDGET = 100000
+
+CODE = """
+import htmldoom, htmldoom.elements, htmldoom.value_loader, htmldoom.yaml_loader
+assert "div" not in vars(htmldoom.elements)
+"""
+
+
+def importtime(code):
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    ).stderr
+    times, total = {}, 0
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line[len("import time:") :].split("|")
+            if not cumulative.strip().isdigit():
+                continue
+            times[name.strip()] = int(cumulative)
+            if name.startswith(" htmldoom"):
+                # Imported directly by the code, including the nested imports.
+                total += int(cumulative)
+    return times, total
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="-X importtime is 3.7+")
+def test_importtime():
+    times, total = importtime(CODE)
+    assert "htmldoom.base" in times
+    assert "yaml" not in times
+    assert "concurrent.futures" not in times
+    assert total < BUDGET
+
+
+def test_lazy_elements():
+    from htmldoom import elements as e
+
+    assert e.div()("x") == b"<div>x</div>"
+    assert "div" in vars(e)
+    assert e.input_(type="text") == b'<input type="text" />'
+    assert e.del_()("x") == b"<del>x</del>"
+    assert "wbr" in dir(e)
+    with pytest.raises(AttributeError):
+        e.notatag
@@ -0,0 +1,160 @@
+import os
+import time
+
+import pytest
+
+from htmldoom import elements as e
+from htmldoom import renders
+from htmldoom.cache import LRU, CacheManager
+from htmldoom.output_cache import MemoryBackend, MmapBackend, OutputCache, _values_key
+
+
+@pytest.fixture(params=["memory", "mmap"])
+def backend(request):
+    if request.param == "mmap":
+        return MmapBackend(slots=64, slot_size=256)
+    return MemoryBackend(CacheManager(maxbytes=10000, maxsize=100, policy=LRU()))
+
+
+def test_cache_by_data(backend):
+    calls = []
+
+    @renders(e.p()("{x}"), cache=OutputCache(backend))
+    def para(x, y=None):
+        calls.append(x)
+        return {"x": x, "unused": y}
+
+    assert para("a") == b"<p>a</p>"
+    assert para("a", y="ignored") == b"<p>a</p>"
+    assert para.fragment("b") == b"<p>b</p>"
+    assert b"".join(para.iter("b")) == b"<p>b</p>"
+    # The function is called to get the data, but the template isn't rendered.
+    assert calls == ["a", "a", "b", "b"]
+    name, identity = para.cache.register(para.__wrapped__, para.template)
+    assert backend.get((name, identity, _values_key(("a",)), ()))
+
+
+def test_same_name(backend):
+    cache = OutputCache(backend)
+
+    def components():
+        @renders(e.p()("{x}"), cache=cache)
+        def item(x):
+            return {"x": x}
+
+        return item
+
+    para = components()
+
+    @renders(e.li()("{x}"), cache=cache)
+    def item(x):
+        return {"x": x}
+
+    assert item.__qualname__ != para.__qualname__
+    item.__qualname__ = para.__qualname__
+    assert para("foo") == b"<p>foo</p>"
+    assert item("foo") == b"<li>foo</li>"
+
+
+def test_lazy_values(backend):
+    cache = OutputCache(backend)
+    calls = []
+
+    @renders(e.ul()("{items}"), cache=cache)
+    def lst(items):
+        calls.append(items)
+        return {"items": (e.li()(i) for i in items)}
+
+    for _ in range(3):
+        assert lst(["a"]) == b"<ul><li>a</li></ul>"
+    assert len(calls) == 3
+    if isinstance(backend, MemoryBackend):
+        assert backend.manager.stats() == {}
+
+
+def test_cache_by_key(backend):
+    calls = []
+    cache = OutputCache(backend, key=lambda x: x, tags=lambda x: ["all", x])
+
+    @renders(e.p()("{x}"), cache=cache)
+    def para(x):
+        calls.append(x)
+        return {"x": x}
+
+    para("a"), para("a"), para("b")
+    assert calls == ["a", "b"]
+
+    para.invalidate("a")
+    para("a"), para("b")
+    assert calls == ["a", "b", "a"]
+
+    cache.invalidate("b")
+    para("a"), para("b")
+    assert calls == ["a", "b", "a", "b"]
+
+    cache.invalidate("all")
+    para("a"), para("b")
+    assert calls == ["a", "b", "a", "b", "a", "b"]
+
+    cache.clear()
+    para("a")
+    assert calls[-1] == "a"
+
+
+def test_equal_values_of_other_types(backend):
+    @renders(e.p()("{x}"), cache=OutputCache(backend))
+    def para(x):
+        return {"x": x}
+
+    assert [para(1), para(True), para(1.0)] == [
+        b"<p>1</p>",
+        b"<p>True</p>",
+        b"<p>1.0</p>",
+    ]
+    assert para((1,)) == b"<p>(1,)</p>"
+    assert para((True,)) == b"<p>(True,)</p>"
+
+
+def test_ttl(backend):
+    calls = []
+
+    @renders(e.p()("{x}"), cache=OutputCache(backend, ttl=0.01))
+    def para(x):
+        calls.append(x)
+        return {"x": x}
+
+    para("a"), para("a")
+    time.sleep(0.02)
+    para("a")
+    assert calls == ["a", "a", "a"]
+
+
+def test_unhashable():
+    @renders(e.p()("{x}"), cache=True)
+    def para(x):
+        return {"x": x}
+
+    assert para(["a"]) == b"<p>['a']</p>"
+
+    @renders(e.p()("{x}"), cache=True)
+    def broken(x):
+        return {}
+
+    with pytest.raises(KeyError):
+        broken("a")
+
+
+def test_mmap_shared():
+    backend = MmapBackend(slots=16, slot_size=128)
+    key = ("renders:para", ("a",), ())
+    pid = os.fork() if hasattr(os, "fork") else None
+    if pid is None:
+        pytest.skip("fork is not available")
+    if pid == 0:
+        backend.set(key, b"<p>a</p>")
+        os._exit(0)
+    os.waitpid(pid, 0)
+    assert backend.get(key) == b"<p>a</p>"
+
+    backend.set(key, b"x" * 128)  # Too big
+    assert backend.get(key) == b"<p>a</p>"
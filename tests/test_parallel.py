@@ -0,0 +1,50 @@
+import pickle
+from functools import partial
+
+from htmldoom import elements as e
+from htmldoom import renders
+from htmldoom.fragment import Fragment
+from htmldoom.parallel import render_many
+from htmldoom.template import Template
+
+
+def page(name):
+    return e.html()(e.body()(e.h1(class_="title")(name)))
+
+
+@renders(e.p()("{x}"))
+def para(x):
+    return {"x": x}
+
+
+def test_pickle():
+    frag = e.div()(e.p()("<"), iter(["x"]))
+    assert pickle.loads(pickle.dumps(frag)) == frag
+    assert isinstance(pickle.loads(pickle.dumps(frag)), Fragment)
+
+    template = Template("<p>{x}</p>")
+    assert pickle.loads(pickle.dumps(template))({"x": 1}) == b"<p>1</p>"
+
+    assert pickle.loads(pickle.dumps(para)) is para
+    assert pickle.loads(pickle.dumps(e.div)) is e.div
+    assert pickle.loads(pickle.dumps(e.br)) is e.br
+
+
+def test_render_many():
+    names = [f"<page {i}>" for i in range(20)]
+    expected = [
+        f'<html><body><h1 class="title">&lt;page {i}&gt;</h1></body></html>'
+        for i in range(20)
+    ]
+    assert list(render_many(partial(page, n) for n in names)) == expected
+    assert list(render_many([partial(page, n) for n in names], workers=1)) == expected
+    assert sorted(render_many(map(partial(partial, page), names), ordered=False)) == [
+        (i, html) for i, html in enumerate(expected)
+    ]
+    assert list(render_many([partial(para, "&")], workers=2)) == ["<p>&amp;</p>"]
+
+
+def test_render_many_warmup():
+    calls = []
+    assert list(render_many([], workers=1, warmup=lambda: calls.append(1))) == []
+    assert calls == [1]
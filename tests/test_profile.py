@@ -0,0 +1,85 @@
+import subprocess
+import sys
+import threading
+
+from htmldoom import elements as e
+from htmldoom import render, renders
+from htmldoom.profile import profile
+
+
+@renders(e.ul()(e.li()("{x}")))
+def sidebar(x):
+    return {"x": x}
+
+
+@renders(e.div()("{side}{y}"))
+def page(y):
+    return {"side": sidebar(y), "y": e.span(id="y")(y)}
+
+
+def test_profile():
+    before = sys.getprofile()
+    with profile() as prof:
+        for i in range(3):
+            render(page(str(i)))
+    assert sys.getprofile() is before
+
+    stats = prof.stats()
+    assert stats["components"]["page"]["calls"] == 3
+    assert stats["components"]["page"]["bytes"] == len(page("0")) * 3
+    assert stats["components"]["sidebar"]["bytes"] == len(sidebar("0")) * 3
+    assert stats["components"]["sidebar"]["time"] > 0
+    assert stats["tags"]["span"]["calls"] == 3
+    assert stats["tags"]["span"]["bytes"] == len(b'<span id="y">0</span>') * 3
+    assert stats["tags"]["span"]["hits"] >= 2
+    assert stats["tags"]["span"]["hit_ratio"] > 0
+
+    stacks = [line.rsplit(" ", 1)[0] for line in prof.collapsed().splitlines()]
+    assert "page;sidebar" in stacks
+    assert "page;<span>" in stacks
+    assert all(
+        int(line.rsplit(" ", 1)[1]) > 0 for line in prof.collapsed().splitlines()
+    )
+
+
+def test_profile_threads():
+    with profile() as prof:
+        thread = threading.Thread(target=page, args=("x",))
+        thread.start()
+        thread.join()
+    assert prof.stats()["components"]["page"]["calls"] == 1
+
+
+def test_profile_threads_stopped():
+    started, stopped, hooks = threading.Event(), threading.Event(), []
+
+    def worker():
+        started.set()
+        stopped.wait()
+        page("x")
+        hooks.append(sys.getprofile())
+
+    def threads_hook(*args):
+        pass
+
+    threading.setprofile(threads_hook)
+    try:
+        with profile() as prof:
+            thread = threading.Thread(target=worker, daemon=True)
+            thread.start()
+            started.wait()
+        assert threading._profile_hook is threads_hook
+    finally:
+        threading.setprofile(None)
+        stopped.set()
+    thread.join()
+    assert "page" not in prof.stats()["components"]
+    assert hooks == [None]
+
+
+def test_profile_env(tmp_path):
+    path = tmp_path / "render.folded"
+    code = "from tests.test_profile import page; page('x')"
+    env = {"HTMLDOOM_PROFILE": str(path), "PATH": ""}
+    subprocess.run([sys.executable, "-c", code], env=env, check=True)
+    assert "page;sidebar " in path.read_text()
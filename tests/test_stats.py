@@ -0,0 +1,48 @@
+from htmldoom import elements as e
+from htmldoom import stats
+from htmldoom.cache import LRU, CacheManager
+
+
+def test_caches():
+    manager = CacheManager(maxbytes=1000, maxsize=2, policy=LRU())
+    manager.set(("foo", "1"), b"a")
+    manager.set(("foo", "2"), b"b")
+    manager.get(("foo", "1"))
+    manager.get(("foo", "3"))
+    manager.set(("bar", "1"), b"c")
+
+    assert stats.caches(manager) == {
+        "foo": dict(hits=1, misses=1, evictions=1, entries=1, bytes=5),
+        "bar": dict(hits=0, misses=0, evictions=0, entries=1, bytes=5),
+    }
+    assert stats.as_dict(manager)["total"] == dict(
+        hits=1, misses=1, evictions=1, entries=2, bytes=10, maxbytes=1000, maxsize=2
+    )
+
+    stats.reset(manager)
+    assert stats.caches(manager)["foo"]["hits"] == 0
+    assert stats.caches(manager)["foo"]["entries"] == 1
+
+
+def test_tags():
+    e.abbr(title="x")
+    e.abbr(title="x")
+    e.abbr(class_="y")
+
+    abbr = stats.tags()["abbr"]
+    assert abbr["kind"] == "composite_tag"
+    assert abbr["hits"] >= 1
+    assert abbr["entries"] >= 1
+    assert abbr["class_entries"] >= 1
+    assert abbr["class_bytes"] > 0
+
+
+def test_as_prometheus():
+    manager = CacheManager(maxbytes=1000, maxsize=2, policy=LRU())
+    manager.set(('fo"o', "1"), b"a")
+    manager.get(('fo"o', "1"))
+
+    text = stats.as_prometheus(manager)
+    assert "# TYPE htmldoom_cache_hits_total counter\n" in text
+    assert 'htmldoom_cache_hits_total{cache="fo\\"o"} 1\n' in text
+    assert 'htmldoom_cache_bytes{cache="fo\\"o"} 6\n' in text
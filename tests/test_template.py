@@ -0,0 +1,111 @@
+from array import array
+from collections import namedtuple
+
+import pytest
+
+from htmldoom import elements as e
+from htmldoom import renders
+from htmldoom.base import raw
+from htmldoom.template import Template
+
+
+def test_template():
+    template = Template("<p>{x}</p><p>{x} again</p>")
+    assert template.fields == ("x",)
+    assert template({"x": "<"}) == b"<p>&lt;</p><p>&lt; again</p>"
+    assert template({"x": raw("<")}) == b"<p><</p><p>< again</p>"
+    assert template({"x": e.i()("<")}) == b"<p><i>&lt;</i></p><p><i>&lt;</i> again</p>"
+    assert template({"x": iter(["<", b"<"])}) == b"<p>&lt;<</p><p>&lt;< again</p>"
+    assert template({"x": e.hr}) == b"<p><hr /></p><p><hr /> again</p>"
+    assert template({"x": 1, "y": 2}) == b"<p>1</p><p>1 again</p>"
+
+
+def test_template_static():
+    assert Template("")({}) == b""
+    assert Template("<p>{{x}}</p>")({}) == b"<p>{x}</p>"
+
+
+def test_template_format():
+    v = namedtuple("Values", "title items")("<b>", {"a": 1})
+    data = {"v": v, "n": 3.14159, "s": "<"}
+    source = "{v.title} {v.items[a]} {n:.2f} {s!r:>5} {s}"
+    assert Template(source)(data) == b"<b> 1 3.14 '&lt;' &lt;"
+
+    # Nested fields in the format spec
+    assert Template("{n:.{p}f}")({"n": 3.14159, "p": 1}) == b"3.1"
+
+
+def test_template_invalid():
+    with pytest.raises(ValueError):
+        Template("<p>{}</p>")
+    with pytest.raises(ValueError):
+        Template("<p>{0}</p>")
+    with pytest.raises(ValueError):
+        Template("<p>{x</p>")
+
+
+def test_template_missing():
+    template = Template("{x}{y}")
+    with pytest.raises(KeyError) as e:
+        template({"z": "x"})
+    assert "x, y: missing" in str(e.value)
+
+
+def test_renders_doesnt_mutate_data():
+    data = {"x": "<"}
+
+    @renders(e.p()("{x}"))
+    def render_para():
+        return data
+
+    assert render_para() == b"<p>&lt;</p>"
+    assert data == {"x": "<"}
+    assert render_para.template.fields == ("x",)
+
+
+def test_renders_invalid():
+    with pytest.raises(ValueError):
+        renders(e.p()("{}"))
+
+
+def test_template_render_rows():
+    row = Template("<tr><td>{name}</td><td>{age}</td><td>{bio}</td></tr>")
+    rows = [
+        {"name": "foo", "age": 21, "bio": raw("<i>x</i>")},
+        {"name": "<bar>", "age": 4.5, "bio": e.i()("&")},
+        {"name": "b\0z", "age": 0, "bio": "&"},
+    ]
+    expected = b"".join(map(row.render, rows))
+    assert row.render_rows(rows) == expected
+    assert row.render_rows(iter(rows)) == expected
+    columns = {k: [r[k] for r in rows] for k in row.fields}
+    assert row.render_rows(columns) == expected
+    assert row.render_rows([]) == b""
+    assert row.render_rows({"name": [], "age": [], "bio": []}) == b""
+
+    # Array columns
+    ages = array("i", [1, 2])
+    assert Template("{age},")({"age": 1}) == b"1,"
+    assert Template("{age},").render_rows({"age": ages}) == b"1,2,"
+
+    # Static templates
+    assert Template("<hr>").render_rows({"a": [1, 2]}) == b"<hr><hr>"
+    assert Template("<hr>").render_rows([{"a": 1}, {"a": 2}]) == b"<hr><hr>"
+    assert Template("<hr>").render_rows({}) == b""
+
+    # Fields that need formatting
+    row = Template("{n:.1f} {s!r} {n}")
+    rows = [{"n": 1.23, "s": "<"}, {"n": 2, "s": "x"}]
+    expected = b"".join(map(row.render, rows))
+    assert row.render_rows(rows) == expected
+    assert row.render_rows({"n": [1.23, 2], "s": ["<", "x"]}) == expected
+
+
+def test_template_render_rows_invalid():
+    row = Template("<td>{x}</td><td>{y}</td>")
+    with pytest.raises(KeyError):
+        row.render_rows([{"x": 1, "y": 2}, {"x": 1}])
+    with pytest.raises(KeyError):
+        row.render_rows({"x": [1]})
+    with pytest.raises(ValueError):
+        row.render_rows({"x": [1, 2], "y": [1]})
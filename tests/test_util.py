@@ -1,3 +1,6 @@
+import asyncio
+import gc
+import sys
 from html import escape
 
 import pytest
@@ -5,7 +8,8 @@ import pytest
 from htmldoom import elements as e
 from htmldoom import functions as fn
 from htmldoom.base import raw, txt
-from htmldoom.util import loadraw, loadtxt, render, renders
+from htmldoom.cache import cache_manager
+from htmldoom.util import loadraw, loadtxt, render, render_iter, renders, send_asgi
 
 
 def test_render():
@@ -18,6 +22,75 @@ def test_render():
         render(1)
 
 
+def test_render_dynamic_memory():
+    def dynamic_render(i):
+        return render((str(x) for x in range(i, i + 3)), map(str, (i,)))
+
+    assert dynamic_render(1) == "1231"
+
+    cache_manager.clear()
+    for i in range(1000):
+        dynamic_render(i)
+    gc.collect()
+    before = sys.getallocatedblocks()
+    for i in range(100000):
+        dynamic_render(i)
+    gc.collect()
+    after = sys.getallocatedblocks()
+
+    assert len(cache_manager) == 0
+    assert after - before < 100
+
+
+def test_render_iter():
+    consumed = []
+
+    def rows():
+        for i in range(3):
+            consumed.append(i)
+            yield e.tr()(e.td()(str(i)))
+
+    chunks = render_iter(e.table()(rows()), chunk_size=0)
+    assert next(chunks) == b"<table>"
+    assert next(chunks) == b"<tr>"
+    assert consumed == [0]
+    assert b"".join(chunks) == (
+        b"<td>0</td></tr><tr><td>1</td></tr><tr><td>2</td></tr></table>"
+    )
+
+    chunks = list(render_iter(e.p()("x" * 10), e.p()("y"), chunk_size=8))
+    assert chunks == [b"<p>xxxxxxxxxx", b"</p><p>y", b"</p>"]
+
+    assert b"".join(render_iter(e.p()("x"))) == b"<p>x</p>"
+
+    # Rendering memoizes the lazy elements, so it can be streamed after that.
+    table = e.table()(rows())
+    assert render(table).encode() == b"".join(render_iter(table)) == bytes(table)
+
+    table = e.table()(rows())
+    list(render_iter(table))
+    with pytest.raises(ValueError):
+        list(render_iter(table))
+
+
+def test_send_asgi():
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(send_asgi(send, e.p()("x"), chunk_size=0))
+    loop.close()
+
+    assert messages == [
+        {"type": "http.response.body", "body": b"<p>", "more_body": True},
+        {"type": "http.response.body", "body": b"x", "more_body": True},
+        {"type": "http.response.body", "body": b"</p>", "more_body": True},
+        {"type": "http.response.body", "body": b"", "more_body": False},
+    ]
+
+
 def test_renders():
     @renders(e.p()("{x}"), e.p()("{x} again"))
     def render_paras(data: dict) -> dict:
@@ -48,6 +121,17 @@ def test_renders():
         render(render_component())
         == "<p><hr /></p><ul><li>a</li><li>b</li><li>c</li></ul>"
     )
+    assert (
+        b"".join(render_component.iter())
+        == b"<p><hr /></p><ul><li>a</li><li>b</li><li>c</li></ul>"
+    )
+    assert (
+        render_component.fragment()
+        == b"<p><hr /></p><ul><li>a</li><li>b</li><li>c</li></ul>"
+    )
+    assert (
+        render_list_item.rows({"item": ["a", "<b>"]}) == b"<li>a</li><li>&lt;b&gt;</li>"
+    )
 
 
 def test_loadtxt_dynamic():
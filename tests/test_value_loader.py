@@ -23,3 +23,47 @@ def test_loadvalues_no_ext():
 def test_loadvalues_duplicate():
     with pytest.raises(NameError):
         loadvalues("tests/assets/values/invalid/duplicate")
+
+
+def test_loadvalues_lazy(tmp_path):
+    (tmp_path / "a.txt").write_text("a")
+    (tmp_path / "b").mkdir()
+    (tmp_path / "b" / "c.txt").write_text("c")
+    rendered = []
+
+    def renderer(path):
+        rendered.append(path)
+        with open(path) as f:
+            return f.read()
+
+    values = loadvalues(tmp_path, extension_renderers={"txt": renderer})
+    assert rendered == []
+    assert values.b.c == "c"
+    assert values.a == "a"
+    assert values.a == "a"
+    assert len(rendered) == 2
+    assert values == ("a", ("c",))
+    assert values._asdict() == {"a": "a", "b": values.b}
+
+    # The rendered values and the node types are reused
+    again = loadvalues(tmp_path, extension_renderers={"txt": renderer})
+    assert again.a == "a" and again.b.c == "c"
+    assert len(rendered) == 2
+    assert type(again) is type(values)
+
+    # Until the files change
+    (tmp_path / "a.txt").write_text("A!")
+    assert loadvalues(tmp_path, extension_renderers={"txt": renderer}).a == "A!"
+    assert len(rendered) == 3
+
+
+def test_loadvalues_workers():
+    values = loadvalues("tests/assets/values/valid", workers=4)
+    assert values == loadvalues("tests/assets/values/valid")
+    assert values.c.d == '<p class="x">x</p>'
+
+
+def test_loadvalues_invalid_name(tmp_path):
+    (tmp_path / "not-valid.txt").write_text("x")
+    with pytest.raises(ValueError):
+        loadvalues(tmp_path)
@@ -1,8 +1,11 @@
+import os
+
 import pytest
 
 from htmldoom import elements as e
-from htmldoom import render
+from htmldoom import render, yaml_loader
 from htmldoom.base import composite_tag, leaf_tag, txt
+from htmldoom.conf import YamlConfig
 from htmldoom.yaml_loader import VALID_FORMAT
 from htmldoom.yaml_loader import loadyaml as ly
 
@@ -103,3 +106,85 @@ def test_invalid_format():
         with pytest.raises(ValueError) as e:
             ly(YAML_INVALID_COMPONENTS, str(i))
         assert VALID_FORMAT in str(e.value)
+
+
+def test_loadyaml_parses_once(monkeypatch, tmp_path):
+    path = tmp_path / "components.yml"
+    path.write_text("a: {p: [[a]]}\nb: {p: [[b]]}\n")
+    loads, yaml_load = [], yaml_loader.load
+
+    def load(*args, **kwargs):
+        loads.append(args)
+        return yaml_load(*args, **kwargs)
+
+    monkeypatch.setattr(yaml_loader, "load", load)
+    assert ly(path, "a") == b"<p>a</p>"
+    assert ly(path, "b") == b"<p>b</p>"
+    assert ly(str(path), ["a"]) == b"<p>a</p>"
+    assert len(loads) == 1
+
+
+def test_loadyaml_hot_reload(monkeypatch, tmp_path):
+    path = tmp_path / "component.yml"
+    path.write_text("p: [[old]]\n")
+    assert ly(path) == b"<p>old</p>"
+
+    path.write_text("p: [[new, version]]\n")
+    os.utime(path, ns=(0, 0))
+    assert ly(path) == b"<p>newversion</p>"
+
+    monkeypatch.setattr(YamlConfig, "HOT_RELOAD", False)
+    path.write_text("p: [[ignored]]\n")
+    os.utime(path, ns=(1, 1))
+    assert ly(path) == b"<p>newversion</p>"
+
+    ly.cache_clear()
+    assert ly(path) == b"<p>ignored</p>"
+
+
+def test_loadyaml_disk_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(YamlConfig, "DISK_CACHE", True)
+    path = tmp_path / "components.yml"
+    path.write_text("a: {p: [[a]]}\nb: {p: [[b]]}\n")
+    assert ly(path, "a") == b"<p>a</p>"
+    assert ly(path, "b", static=True) == b"<p>b</p>"
+    # Written in a batch
+    assert not (tmp_path / "components.htmldoomc").exists()
+    yaml_loader.flush()
+    assert (tmp_path / "components.htmldoomc").exists()
+
+    # A fresh process loads the rendered directives without parsing
+    def load(*args, **kwargs):
+        raise AssertionError("parsed")
+
+    ly.cache_clear()
+    monkeypatch.setattr(yaml_loader, "load", load)
+    assert ly(path, "a") == b"<p>a</p>"
+    assert ly(path, "b", static=True) == b"<p>b</p>"
+
+    # The edited files are parsed again
+    monkeypatch.undo()
+    monkeypatch.setattr(YamlConfig, "DISK_CACHE", True)
+    path.write_text("a: {p: [[c]]}\n")
+    ly.cache_clear()
+    assert ly(path, "a") == b"<p>c</p>"
+
+
+def test_loadyaml_disk_cache_merge(monkeypatch, tmp_path):
+    monkeypatch.setattr(YamlConfig, "DISK_CACHE", True)
+    path = tmp_path / "components.yml"
+    path.write_text("a: {p: [[a]]}\nb: {p: [[b]]}\n")
+    stamp = yaml_loader._stamp(path)
+
+    # Two processes rendering different directives
+    first = yaml_loader._Document(str(path), stamp)
+    second = yaml_loader._Document(str(path), stamp)
+    first.render(("a",), False)
+    second.render(("b",), False)
+    yaml_loader.flush()
+
+    third = yaml_loader._Document(str(path), stamp)
+    assert third.compiled == {
+        (("a",), False): b"<p>a</p>",
+        (("b",), False): b"<p>b</p>",
+    }